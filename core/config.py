@@ -15,10 +15,23 @@ ANIM_DURATION = 100
 # --- Chunk Management ---
 CHUNK_SIZE = 16  # Size of each chunk (in blocks)
 
+# --- Saving ---
+AUTOSAVE_INTERVAL = 60  # Seconds between autosaves (0 disables autosave)
+AUTOSAVE_FSYNC = True  # Force saved data to disk before reporting a save as done
+
 # --- Graphics Settings ---
 WINDOW_TITLE = "Pixel Mining - Modular"
 FPS_CAP = 165
 
+# --- Simulation ---
+SIMULATION_TICK_RATE = 20  # Fixed updates per second for machines, conveyors and extractors
+MAX_SIMULATION_STEPS = 5  # Most ticks run in one frame when catching up; the rest is dropped
+
+# Memory budgets for cached rendered surfaces (least recently used are dropped first)
+CHUNK_CACHE_BUDGET = 32 * 1024 * 1024  # Individual chunk surfaces
+SUPER_CHUNK_CACHE_BUDGET = 64 * 1024 * 1024  # 8x8 chunk tiles
+LOD_CACHE_BUDGET = 16 * 1024 * 1024  # Zoomed-out tiles, all levels
+
 # --- Physics ---
 GRAVITY = 500
 JUMP_SPEED = -300
@@ -71,6 +84,10 @@ if "ORE_PROCESSOR" not in globals():
 # Add Snow Block ID
 SNOW_BLOCK = 20
 
+# --- Chunk Storage ---
+# Chunk cells hold block IDs; one byte is enough while the IDs stay below 256
+CHUNK_DTYPE = "uint8" if max(BLOCKS) < 256 else "int32"
+
 # --- Colors ---
 COLOR_FPS = (255, 255, 0)
 COLOR_PLAYER = (0, 0, 255)
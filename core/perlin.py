@@ -1,4 +1,7 @@
 import random
+from functools import lru_cache
+
+import numpy as np
 
 class PerlinNoise:
     def __init__(self, seed=0):
@@ -59,3 +62,83 @@ def octave_noise(perlin, x, y, octaves=1, persistence=0.5, lacunarity=2.0):
         amplitude *= persistence
         frequency *= lacunarity
     return total / max_value if max_value > 0 else 0
+
+# --- Vectorized (NumPy) noise ---
+# The functions below evaluate the same noise as PerlinNoise/octave_noise, but
+# on whole arrays of coordinates at once. Operation order matches the scalar
+# version so both produce identical values for the same seed.
+
+@lru_cache(maxsize=8)
+def permutation_table(seed):
+    """Return the doubled permutation table for a seed as a read-only array.
+
+    Uses a private Random instance, so it yields the same table as
+    PerlinNoise(seed) without reseeding the global random module.
+    """
+    p = list(range(256))
+    random.Random(seed).shuffle(p)
+    table = np.array(p + p, dtype=np.int64)
+    table.flags.writeable = False
+    return table
+
+def _fade(t):
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+def _lerp(t, a, b):
+    return a + t * (b - a)
+
+# grad(hash, x, y, 0) reduces to GRAD_X[h] * x + GRAD_Y[h] * y with h = hash & 15
+GRAD_X = np.array([1, -1, 1, -1, 1, -1, 1, -1, 0, 0, 0, 0, 1, 0, -1, 0], dtype=np.float64)
+GRAD_Y = np.array([1, 1, -1, -1, 0, 0, 0, 0, 1, -1, 1, -1, 1, -1, 1, -1], dtype=np.float64)
+
+def _grad(hash, x, y):
+    h = hash & 15
+    return GRAD_X[h] * x + GRAD_Y[h] * y
+
+def noise_array(perm, x, y):
+    """Evaluate Perlin noise for arrays of coordinates using a permutation table.
+
+    This is the z = 0 slice of PerlinNoise.noise, which is all the terrain
+    generator samples; at z = 0 the far z layer is weighted by zero.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # int() truncates toward zero, so use trunc rather than floor
+    xi = np.trunc(x)
+    yi = np.trunc(y)
+    X = xi.astype(np.int64) & 255
+    Y = yi.astype(np.int64) & 255
+
+    x = x - xi
+    y = y - yi
+
+    u = _fade(x)
+    v = _fade(y)
+
+    A = perm[X] + Y
+    AA = perm[A]
+    AB = perm[A + 1]
+    B = perm[X + 1] + Y
+    BA = perm[B]
+    BB = perm[B + 1]
+
+    return _lerp(v, _lerp(u, _grad(perm[AA], x, y),
+                             _grad(perm[BA], x - 1, y)),
+                    _lerp(u, _grad(perm[AB], x, y - 1),
+                             _grad(perm[BB], x - 1, y - 1)))
+
+def octave_noise_array(perm, x, y, octaves=1, persistence=0.5, lacunarity=2.0):
+    """Fractal (fBm) noise over arrays of coordinates, see octave_noise."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    total = np.zeros(np.broadcast(x, y).shape)
+    frequency = 1
+    amplitude = 1
+    max_value = 0
+    for i in range(octaves):
+        total += noise_array(perm, x * frequency, y * frequency) * amplitude
+        max_value += amplitude
+        amplitude *= persistence
+        frequency *= lacunarity
+    return total / max_value if max_value > 0 else total
@@ -17,19 +17,23 @@ import traceback
 # Import core modules
 from core import config
 
-# Import the queue explicitly from chunks 
-from world.chunks import (chunk_generation_queue, loaded_chunks, modified_chunks, 
-                         chunk_lock, get_chunk_coords, generate_chunk, 
+# Import chunk loading, generation and editing from chunks
+from world.chunks import (request_chunks_around, loaded_chunks, bump_chunk_version,
+                         chunk_lock, get_chunk_coords, generate_chunk, generate_region,
                          ensure_chunks_around_point, unload_distant_chunks, 
                          get_active_chunks, set_block_at, get_block_at,
                          mark_chunk_modified, start_chunk_workers, stop_chunk_workers,
-                         save_world_to_file, load_world_from_file)
+                         load_world_from_file, integrate_generated_chunks,
+                         open_chunk_store)
+from world.autosave import AutosaveManager
 
 from entities.player import Player
 from ui.inventory import Inventory
 from ui.machine_ui import MachineUI
 from systems.machine_system import MachineSystem
-from utils.rendering import create_block_surfaces, render_chunk, draw_performance_stats, render_block
+from utils.rendering import (create_block_surfaces, render_chunk, draw_performance_stats, render_block,
+                             render_super_chunks, render_lod_chunks, get_lod_level, get_opaque_screen_top,
+                             screen_to_world, world_to_screen)
 from systems.crafting_system import CraftingSystem
 from ui.crafting_ui import CraftingUI
 from systems.storage_system import StorageSystem
@@ -37,7 +41,9 @@ from systems.conveyor_system import ConveyorSystem
 from ui.storage_ui import StorageUI
 from systems.multi_block_system import MultiBlockSystem
 from systems.extractor_system import ExtractorSystem
-from utils.background import generate_clouds, generate_hills, generate_stars, draw_background
+from systems.simulation_scheduler import SimulationScheduler
+from utils.surface_format import convert_surfaces, on_display_change, refresh_display_format
+from utils.background import generate_clouds, generate_hills, generate_stars, BackgroundRenderer
 from world.block_utils import apply_gravity
 
 # Import GPU detection
@@ -56,6 +62,8 @@ VIEW_DISTANCE_MULTIPLIER = 1.5  # Reduce view distance multiplier
 CHUNK_LOAD_RADIUS = 4      # Increased radius to reduce frequent loading/unloading
 CHUNK_UNLOAD_DISTANCE = 6  # Increased distance to add a buffer
 CHUNK_GEN_THREAD_COUNT = 20 # Augmentez à 4 threads pour une génération plus rapide
+CHUNK_GEN_BACKEND = "thread"  # "thread" or "process" (worker processes, bypasses the GIL; Linux only)
+CHUNK_GEN_PROCESS_COUNT = max(1, (os.cpu_count() or 2) - 1)  # Leave one core for the game loop
 ENABLE_INFINITE_WORLD = True  # Enable infinite world generation
 USE_GPU_GENERATION = True  # Use GPU for generation if available
 
@@ -72,11 +80,11 @@ def find_spawn_position():
         if (0, 0) not in loaded_chunks:
             print("Origin chunk missing in find_spawn_position, creating one...")
             # Create a simple chunk if it's missing
-            chunk = np.zeros((config.CHUNK_SIZE, config.CHUNK_SIZE), dtype=np.int32)
+            chunk = np.zeros((config.CHUNK_SIZE, config.CHUNK_SIZE), dtype=config.CHUNK_DTYPE)
             chunk[:config.CHUNK_SIZE//2, :] = config.EMPTY  # Top half is empty
             chunk[config.CHUNK_SIZE//2:, :] = config.DIRT   # Bottom half is dirt
             loaded_chunks[(spawn_chunk_x, spawn_chunk_y)] = chunk
-            modified_chunks.add((spawn_chunk_x, spawn_chunk_y))
+            bump_chunk_version(spawn_chunk_x, spawn_chunk_y)
             print("Created emergency origin chunk!")
         
         # Get the origin chunk
@@ -99,7 +107,7 @@ def find_spawn_position():
         # If no empty space at all, create one at the top
         print("No empty space found in origin chunk, creating one at top center")
         middle_x = config.CHUNK_SIZE // 2
-        chunk[0, middle_x] = config.EMPTY
+        set_block_at(middle_x, 0, config.EMPTY)  # Also promotes a uniform chunk
         return middle_x * config.PIXEL_SIZE, 0
         
     except Exception as e:
@@ -205,6 +213,13 @@ def handle_mining(dt, mouse_x, mouse_y, player_x, player_y, camera_x, camera_y):
                 else:
                     set_block_at(dig_x, dig_y, config.EMPTY)
                 
+                # A mined conveyor stops carrying items and unlinks from its neighbours;
+                # its other blocks go with it rather than stay as a dead belt
+                if block_type in (config.CONVEYOR_BELT, config.VERTICAL_CONVEYOR) and \
+                        get_block_at(dig_x, dig_y) == config.EMPTY:
+                    conveyor_system.remove_conveyor(dig_x, dig_y)
+                    multi_block_system.remove_multi_block(dig_x, dig_y)
+                
                 mining_progress.pop(block_index, None)  # Remove progress
             
             laser_points.append((dig_x * config.PIXEL_SIZE + config.PIXEL_SIZE // 2 - camera_x,
@@ -224,6 +239,8 @@ fps_font = pygame.font.SysFont("Consolas", 18)
 
 # Create block surfaces
 block_surfaces = create_block_surfaces()
+# Keep them in the display format when the mode changes (UI and item sprites are scaled from them)
+on_display_change(lambda: convert_surfaces(block_surfaces))
 
 # Test rendering of block surfaces
 for block_id, surface in block_surfaces.items():
@@ -233,11 +250,14 @@ for block_id, surface in block_surfaces.items():
         print(f"Block ID {block_id} rendered successfully.")
 
 # Initialize systems
+# Machines, conveyors and extractors tick at a fixed rate on the simulation clock
+simulation = SimulationScheduler()
+
 # Create MultiBlockSystem before others that depend on it
 multi_block_system = MultiBlockSystem(get_block_at, set_block_at)
 
 # Initialize the machine system
-machine_system = MachineSystem(get_block_at, set_block_at)
+machine_system = MachineSystem(get_block_at, set_block_at, get_time=simulation.get_time, timers=simulation.timers)
 
 # Initialize machine UI
 machine_ui = MachineUI(screen_width, screen_height, block_surfaces)
@@ -253,9 +273,15 @@ storage_ui = StorageUI(screen_width, screen_height, block_surfaces)
 
 # Initialize extractor system to move items
 extractor_system = ExtractorSystem(
-    get_block_at, set_block_at, storage_system, conveyor_system, multi_block_system
+    get_block_at, set_block_at, storage_system, conveyor_system, multi_block_system,
+    get_time=simulation.get_time, timers=simulation.timers
 )
 
+# Same order as before the fixed timestep: machines, then conveyors, then extractors
+simulation.add_system(lambda step_dt: machine_system.update())
+simulation.add_system(lambda step_dt: conveyor_system.update(step_dt, storage_system, machine_system))
+simulation.add_system(extractor_system.update)
+
 # Initialize inventory
 inventory = Inventory()
 
@@ -272,8 +298,11 @@ conveyor_placement_preview = []  # Liste des positions de prévisualisation
 random.seed(SEED)
 np.random.seed(SEED)
 
-# Start chunk generation worker threads
-chunk_workers = start_chunk_workers(CHUNK_GEN_THREAD_COUNT, SEED)
+# Start chunk generation workers
+if CHUNK_GEN_BACKEND == "process":
+    chunk_workers = start_chunk_workers(CHUNK_GEN_PROCESS_COUNT, SEED, backend="process")
+else:
+    chunk_workers = start_chunk_workers(CHUNK_GEN_THREAD_COUNT, SEED)
 
 # Initialize game state
 if os.path.exists(SAVE_FILE):
@@ -292,6 +321,12 @@ else:
     random.seed(SEED)
     np.random.seed(SEED)
 
+# Unloaded chunks are written next to the save file and read back when revisited
+open_chunk_store(SAVE_FILE)
+
+# Periodic incremental saves, written in the background
+autosave = AutosaveManager(SAVE_FILE, storage_system)
+
 # Explicitly verify that chunks are loaded correctly
 with chunk_lock:
     if len(loaded_chunks) == 0:
@@ -324,24 +359,10 @@ mining_animation = {}  # Dictionary to store mining animation progress
 print("Starting initial chunk generation...")
 player_chunk_x, player_chunk_y = get_chunk_coords(int(player.x), int(player.y))
 
-# Queue additional chunks for background loading
-for dy in range(-4, 5):
-    for dx in range(-4, 5):
-        cx = int(player_chunk_x + dx)
-        cy = int(player_chunk_y + dy)
-        # Skip chunks we already generated
-        if abs(dx) <= 2 and abs(dy) <= 2:
-            continue
-        if (cx, cy) not in loaded_chunks:
-            chunk_generation_queue.put((cx, cy, SEED))
+# Generate the 9x9 square of chunks around the player in one batched pass
+generate_region(player_chunk_x - 4, player_chunk_y - 4, 9, 9, SEED)
 
-print(f"Initial chunks generated. Queued additional {chunk_generation_queue.qsize()} chunks.")
-
-# Generate initial chunks around the player
-player_chunk_x, player_chunk_y = get_chunk_coords(int(player.x), int(player.y))
-for dx in range(-3, 4):
-    for dy in range(-3, 4):
-        generate_chunk(player_chunk_x + dx, player_chunk_y + dy, SEED)
+print(f"Initial chunks generated. {len(loaded_chunks)} chunks loaded.")
 
 # Initialize time of day (Terraria-style day/night cycle)
 time_of_day = 0.3  # Start at morning
@@ -353,6 +374,7 @@ background_height = screen_height
 cloud_layer = generate_clouds(background_width, background_height, SEED)
 hill_layers = generate_hills(background_width, background_height, 2, SEED)
 star_layer = generate_stars(background_width, background_height, SEED)
+background = BackgroundRenderer(background_width, background_height, cloud_layer, hill_layers, star_layer)
 
 # Check for GPU at startup
 if USE_GPU_GENERATION:
@@ -365,46 +387,11 @@ if USE_GPU_GENERATION:
 # Initialize main menu
 main_menu = MainMenu(screen_width, screen_height)
 
-def generate_chunk_with_validation(chunk_x, chunk_y, seed):
-    """Generate a chunk and validate its contents."""
-    chunk = generate_chunk(chunk_x, chunk_y, seed)
-    
-    # Vérifiez que tous les blocs générés sont valides
-    for y in range(config.CHUNK_SIZE):
-        for x in range(config.CHUNK_SIZE):
-            block_type = chunk[y, x]
-            if block_type not in config.BLOCKS:
-                print(f"Invalid block type {block_type} at ({x}, {y}) in chunk ({chunk_x}, {chunk_y}). Replacing with EMPTY.")
-                chunk[y, x] = config.EMPTY  # Remplacez les blocs non valides par EMPTY
-    
-    # Retournez le chunk validé
-    return chunk
-
-# Remplacez les appels à `generate_chunk` par `generate_chunk_with_validation`
-for dy in range(-3, 4):
-    for dx in range(-3, 4):
-        cx = int(player_chunk_x + dx)
-        cy = int(player_chunk_y + dy)
-        if (cx, cy) not in loaded_chunks:
-            print(f"Generating and validating chunk at ({cx, cy})...")
-            loaded_chunks[(cx, cy)] = generate_chunk_with_validation(cx, cy, SEED)
-            modified_chunks.add((cx, cy))
-
 def render_visible_chunks(screen, camera_x, camera_y, active_chunks, loaded_chunks, block_surfaces, machine_system):
     """Render only the visible chunks to improve performance."""
-    rendered_chunks = {}
-    for chunk_x, chunk_y in active_chunks:
-        if (chunk_x, chunk_y) in loaded_chunks:
-            chunk = loaded_chunks[(chunk_x, chunk_y)]
-            rendered_chunks[(chunk_x, chunk_y)] = render_chunk(
-                chunk, chunk_x, chunk_y, camera_x, camera_y, 
-                mining_animation, block_surfaces, machine_system
-            )
-    
-    for (chunk_x, chunk_y), surface in rendered_chunks.items():
-        chunk_screen_x = chunk_x * config.CHUNK_SIZE * config.PIXEL_SIZE - camera_x
-        chunk_screen_y = chunk_y * config.CHUNK_SIZE * config.PIXEL_SIZE - camera_y
-        screen.blit(surface, (chunk_screen_x, chunk_screen_y))
+    # Chunks are composited into 8x8 super-chunk tiles: one blit per tile
+    render_super_chunks(screen, camera_x, camera_y, active_chunks, loaded_chunks,
+                        mining_animation, block_surfaces, machine_system)
 
 def render_debug_chunks(screen, camera_x, camera_y, active_chunks):
     """Render chunk borders for debugging purposes."""
@@ -419,61 +406,23 @@ def render_debug_chunks(screen, camera_x, camera_y, active_chunks):
 # Corrigez les appels à `get_chunk_coords` pour garantir que les coordonnées sont des entiers
 player_chunk_x, player_chunk_y = get_chunk_coords(int(player.x), int(player.y))
 
-# Assurez-vous que les coordonnées des chunks sont des entiers dans toutes les boucles
-for dy in range(-3, 4):
-    for dx in range(-3, 4):
-        cx = int(player_chunk_x + dx)
-        cy = int(player_chunk_y + dy)
-        if (cx, cy) not in loaded_chunks:
-            print(f"Generating and validating chunk at ({cx, cy})...")
-            loaded_chunks[(cx, cy)] = generate_chunk_with_validation(cx, cy, SEED)
-            modified_chunks.add((cx, cy))
-
 # Vérifiez également les coordonnées dans `ensure_chunks_around_point`
 def ensure_chunks_around_point(x, y, radius):
     """Ensure chunks are loaded around a point."""
     chunk_x, chunk_y = get_chunk_coords(x, y)
-    for dy in range(-radius, radius + 1):
-        for dx in range(-radius, radius + 1):
-            cx, cy = int(chunk_x + dx), int(chunk_y + dy)
-            if (cx, cy) not in loaded_chunks:
-                chunk_generation_queue.put((cx, cy, SEED))
+    request_chunks_around(int(chunk_x), int(chunk_y), radius, SEED)
 
 def ensure_chunks_around_point_optimized(x, y, radius):
     """Ensure chunks are loaded around a point with optimized checks."""
+    # The scheduler keeps one request per chunk, ordered by distance to the
+    # player, and drops requests that fall out of range when the player moves
     chunk_x, chunk_y = get_chunk_coords(x, y)
-    chunks_to_generate = []
-    
-    for dy in range(-radius, radius + 1):
-        for dx in range(-radius, radius + 1):
-            cx, cy = chunk_x + dx, chunk_y + dy
-            if (cx, cy) not in loaded_chunks:
-                chunks_to_generate.append((cx, cy))
-    
-    # Trier les chunks par distance pour prioriser ceux proches du joueur
-    chunks_to_generate.sort(key=lambda coords: abs(coords[0] - chunk_x) + abs(coords[1] - chunk_y))
-    
-    # Ajouter les chunks à la file d'attente
-    for cx, cy in chunks_to_generate:
-        chunk_generation_queue.put((cx, cy, SEED))
+    request_chunks_around(chunk_x, chunk_y, radius, SEED)
 
 def ensure_chunks_around_player(player_x, player_y, radius):
     """Ensure chunks are loaded around the player's position."""
     chunk_x, chunk_y = get_chunk_coords(player_x, player_y)
-    chunks_to_generate = []
-
-    for dy in range(-radius, radius + 1):
-        for dx in range(-radius, radius + 1):
-            cx, cy = chunk_x + dx, chunk_y + dy
-            if (cx, cy) not in loaded_chunks:
-                chunks_to_generate.append((cx, cy))
-
-    # Trier les chunks par distance au joueur pour prioriser ceux proches
-    chunks_to_generate.sort(key=lambda coords: abs(coords[0] - chunk_x) + abs(coords[1] - chunk_y))
-
-    # Ajouter les chunks à la file d'attente
-    for cx, cy in chunks_to_generate:
-        chunk_generation_queue.put((cx, cy, SEED))
+    request_chunks_around(chunk_x, chunk_y, radius, SEED)
 
 # Remplacez les appels à `ensure_chunks_around_point` par `ensure_chunks_around_player`
 # Main Game Loop
@@ -515,26 +464,32 @@ if __name__ == '__main__':
                     dt = 1 / config.FPS_CAP  # Avoid division by zero
                 last_time = current_time
                 
+                # Zoom level of the view, which clicks are mapped through
+                lod_level = get_lod_level(VIEW_DISTANCE_MULTIPLIER)
+                
                 # Handle events
                 for event in pygame.event.get():
                     if event.type == pygame.QUIT:
-                        save_world_to_file(SAVE_FILE, storage_system)
-                        running = False
+                        running = False  # The world is saved when the loop exits
+                    
+                    elif event.type == pygame.VIDEORESIZE:
+                        screen_width, screen_height = event.size
+                        screen = pygame.display.set_mode((screen_width, screen_height), pygame.RESIZABLE)
+                        # The new mode may use another pixel format
+                        refresh_display_format()
+                        machine_ui.update_screen_size(screen_width, screen_height)
+                        crafting_ui.update_screen_size(screen_width, screen_height)
+                        storage_ui.update_screen_size(screen_width, screen_height)
                     
                     elif event.type == pygame.KEYDOWN:
                         if event.key == pygame.K_o:  # Press 'O' to manually save the map
-                            save_world_to_file(SAVE_FILE, storage_system)
+                            autosave.save()
                         elif event.key == pygame.K_l:  # Press 'L' to manually load the map
+                            autosave.flush()
                             load_world_from_file(SAVE_FILE, storage_system)
                         elif event.key == pygame.K_c:  # Press 'C' to toggle player collision
                             player.toggle_collision()
                             print(f"Player collision {'enabled' if player.collision_enabled else 'disabled'}.")
-                        elif event.key == pygame.VIDEORESIZE:
-                            screen_width, screen_height = event.size
-                            screen = pygame.display.set_mode((screen_width, screen_height), pygame.RESIZABLE)
-                            machine_ui.update_screen_size(screen_width, screen_height)
-                            crafting_ui.update_screen_size(screen_width, screen_height)
-                            storage_ui.update_screen_size(screen_width, screen_height)
                         elif event.key == pygame.K_1:  # Number keys to select hotbar slots
                             inventory.select_slot(0)
                         elif event.key == pygame.K_2:
@@ -609,8 +564,9 @@ if __name__ == '__main__':
                     
                     elif event.type == pygame.MOUSEBUTTONDOWN:
                         mouse_x, mouse_y = pygame.mouse.get_pos()
-                        world_x = mouse_x + camera_x
-                        world_y = mouse_y + camera_y
+                        # The cell under the cursor, through the LOD zoom
+                        world_x, world_y = screen_to_world(mouse_x, mouse_y, camera_x, camera_y,
+                                                           screen_width, screen_height, lod_level)
                         block_x = int(world_x // config.PIXEL_SIZE)
                         block_y = int(world_y // config.PIXEL_SIZE)
                         
@@ -890,12 +846,17 @@ if __name__ == '__main__':
                 # Update camera to follow player
                 camera_x = player.x - screen_width // 2
                 camera_y = player.y - screen_height // 2
+                lod_level = get_lod_level(VIEW_DISTANCE_MULTIPLIER)  # The view distance keys may have changed it
                 
                 # Handle mining and laser
                 mouse_pressed = pygame.mouse.get_pressed()[0]  # Left mouse button
                 if mouse_pressed and not inventory.dragged_item:  # Don't mine while dragging items
                     mouse_x, mouse_y = pygame.mouse.get_pos()
-                    laser_points = handle_mining(dt, mouse_x, mouse_y, player.x, player.y, camera_x, camera_y)
+                    # handle_mining works in unzoomed screen coordinates
+                    world_x, world_y = screen_to_world(mouse_x, mouse_y, camera_x, camera_y,
+                                                       screen_width, screen_height, lod_level)
+                    laser_points = handle_mining(dt, world_x - camera_x, world_y - camera_y,
+                                                 player.x, player.y, camera_x, camera_y)
                     laser_active = len(laser_points) > 0
                 else:
                     laser_active = False
@@ -904,22 +865,23 @@ if __name__ == '__main__':
                 # Manage chunks for infinite world
                 if ENABLE_INFINITE_WORLD:
                     # Ensure chunks are loaded in waves, not all at once
-                    ensure_chunks_around_point_optimized(player.x, player.y, CHUNK_LOAD_RADIUS)
+                    # Zoomed out, each LOD level doubles the distance that must stay loaded
+                    ensure_chunks_around_point_optimized(player.x, player.y, CHUNK_LOAD_RADIUS * 2 ** lod_level)
+                    
+                    # Merge chunks finished by worker processes (no-op with threads)
+                    integrate_generated_chunks()
                     
                     # Unload distant chunks with a cooldown
                     if time.time() - last_unload_time > UNLOAD_COOLDOWN:
                         print(f"Checking chunks to unload. {len(loaded_chunks)} chunks currently loaded.")
-                        unload_distant_chunks(player.x, player.y, CHUNK_UNLOAD_DISTANCE)
+                        unload_distant_chunks(player.x, player.y, CHUNK_UNLOAD_DISTANCE * 2 ** lod_level)
                         last_unload_time = time.time()
                 
-                # Update machines
-                machine_system.update()
-                
-                # Update conveyor system
-                conveyor_system.update(dt, storage_system, machine_system)
+                # Autosave changed chunks in the background when the interval elapses
+                autosave.tick(current_time)
                 
-                # Mettre à jour le système d'extraction pour déplacer les items
-                extractor_system.update(dt)
+                # Machines, conveyors and extractors run in fixed ticks, whatever the frame rate
+                simulation.advance(dt)
                 
                 # Update time of day
                 time_of_day += dt / DAY_LENGTH
@@ -929,32 +891,44 @@ if __name__ == '__main__':
             
 
                 # --- RENDERING ---
-                # Draw the background with parallax effect
-                draw_background(screen, camera_x, camera_y, time_of_day, background_width, background_height, 
-                                cloud_layer, hill_layers, star_layer)
+                # Draw the background with parallax effect, except where opaque terrain covers it
+                opaque_top = None
+                if lod_level == 0:
+                    opaque_top = get_opaque_screen_top(camera_x, camera_y, screen_width, screen_height,
+                                                       loaded_chunks, block_surfaces)
+                background.draw(screen, camera_x, camera_y, time_of_day, opaque_top)
                 
-                # Optimized chunk rendering
-                active_chunks = get_active_chunks(player.x, player.y, screen_width, screen_height, 
-                                                  VIEW_DISTANCE_MULTIPLIER, MAX_ACTIVE_CHUNKS)
-                render_visible_chunks(screen, camera_x, camera_y, active_chunks, loaded_chunks, block_surfaces, machine_system)
+                # Optimized chunk rendering; large view distances zoom out with downsampled chunks
+                if lod_level > 0:
+                    # Downsampled chunks are cheap, so the cap grows with the visible area
+                    active_chunks = get_active_chunks(player.x, player.y, screen_width, screen_height,
+                                                      2 ** lod_level, MAX_ACTIVE_CHUNKS * 4 ** lod_level)
+                    render_lod_chunks(screen, camera_x, camera_y, active_chunks, loaded_chunks,
+                                      block_surfaces, lod_level)
+                else:
+                    active_chunks = get_active_chunks(player.x, player.y, screen_width, screen_height, 
+                                                      VIEW_DISTANCE_MULTIPLIER, MAX_ACTIVE_CHUNKS)
+                    render_visible_chunks(screen, camera_x, camera_y, active_chunks, loaded_chunks, block_surfaces, machine_system)
                 
                 # Render chunk borders in debug mode
-                if DEBUG_MODE:
+                if DEBUG_MODE and lod_level == 0:
                     render_debug_chunks(screen, camera_x, camera_y, active_chunks)
 
                 player.draw(screen, camera_x, camera_y)
                 
                 if laser_active and len(laser_points) >= 2:
-                    start_point = (player.x + player.width // 2 - camera_x,
-                                player.y + player.height // 2 - camera_y)
-                    pygame.draw.line(screen, (255, 0, 0), start_point, laser_points[0], 3)
+                    start_point = world_to_screen(player.x + player.width // 2, player.y + player.height // 2,
+                                                  camera_x, camera_y, screen_width, screen_height, lod_level)
+                    end_point = world_to_screen(laser_points[0][0] + camera_x, laser_points[0][1] + camera_y,
+                                                camera_x, camera_y, screen_width, screen_height, lod_level)
+                    pygame.draw.line(screen, (255, 0, 0), start_point, end_point, 3)
                 
                 inventory.draw(screen, screen_width, screen_height)
                 
                 active_machine = machine_system.get_active_machine()
                 if active_machine:
                     machine_data = machine_system.get_machine_data(active_machine)
-                    progress = machine_system.get_machine_progress(active_machine)
+                    progress = machine_system.get_machine_progress(active_machine, simulation.get_render_time())
                     machine_ui.draw(screen, machine_data, progress, inventory.dragged_item)
                 
                 active_table = crafting_system.get_active_table()
@@ -967,8 +941,9 @@ if __name__ == '__main__':
                     storage_data = storage_system.get_storage_at(*active_storage)
                     storage_ui.draw(screen, storage_data, inventory.dragged_item)
                 
-                # Draw items on conveyor belts
-                conveyor_system.draw_items(screen, camera_x, camera_y, block_surfaces)
+                # Draw items on conveyor belts (too small to see when zoomed out)
+                if lod_level == 0:
+                    conveyor_system.draw_items(screen, camera_x, camera_y, block_surfaces, simulation.get_alpha())
                 
                 # Calcul de la prévisualisation du placement de convoyeurs
                 if conveyor_placement_active and inventory.get_selected_item():
@@ -976,8 +951,8 @@ if __name__ == '__main__':
                     if selected_type in [config.CONVEYOR_BELT, config.VERTICAL_CONVEYOR]:
                         # Calculer la position du bloc sous la souris
                         mouse_x, mouse_y = pygame.mouse.get_pos()
-                        world_x = mouse_x + camera_x
-                        world_y = mouse_y + camera_y
+                        world_x, world_y = screen_to_world(mouse_x, mouse_y, camera_x, camera_y,
+                                                           screen_width, screen_height, lod_level)
                         block_x = int(world_x // config.PIXEL_SIZE)
                         block_y = int(world_y // config.PIXEL_SIZE)
                         
@@ -1080,8 +1055,12 @@ if __name__ == '__main__':
                                 ])
                             
                             # Afficher la prévisualisation sur l'écran
-                            screen_x = pos_x * config.PIXEL_SIZE - camera_x
-                            screen_y = pos_y * config.PIXEL_SIZE - camera_y
+                            screen_x, screen_y = world_to_screen(pos_x * config.PIXEL_SIZE, pos_y * config.PIXEL_SIZE,
+                                                                 camera_x, camera_y, screen_width, screen_height, lod_level)
+                            if lod_level > 0:
+                                preview_surface = pygame.transform.scale(
+                                    preview_surface, (max(1, preview_surface.get_width() >> lod_level),
+                                                      max(1, preview_surface.get_height() >> lod_level)))
                             screen.blit(preview_surface, (screen_x, screen_y))
                 
                 inventory.draw_dragged_item(screen)
@@ -1092,7 +1071,7 @@ if __name__ == '__main__':
                 pygame.display.flip()
                 clock.tick(config.FPS_CAP)
             
-            save_world_to_file(SAVE_FILE, storage_system)
+            autosave.stop()
             stop_chunk_workers(chunk_workers)
             
             profiler.disable()
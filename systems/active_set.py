@@ -0,0 +1,79 @@
+_cell_listeners = []  # Functions called as callback((x, y)) when something changes at a cell
+
+def on_cell_change(callback):
+    """Register a function to call with each cell reported by notify_cell_change()."""
+    _cell_listeners.append(callback)
+    return callback
+
+def notify_cell_change(x, y, width=1, height=1):
+    """Report a change (block placed, storage or machine contents) over a rectangle of cells."""
+    for dx in range(width):
+        for dy in range(height):
+            for callback in _cell_listeners:
+                callback((x + dx, y + dy))
+
+class ActiveSet:
+    """Entities with work to do; the others sleep until an event wakes them.
+
+    A system loops only over `active`. An entity that finds nothing to do
+    goes to sleep watching some cells (where a storage could be placed, the
+    storage it empties...) and is woken when notify() reports a change at
+    one of them, or directly with wake(). Sleeping entities cost nothing
+    per tick.
+    """
+
+    def __init__(self):
+        self.active = set()
+        self._watched = {}  # {sleeping key: cells it watches}
+        self._watchers = {}  # {cell: set of sleeping keys watching it}
+
+    def __contains__(self, key):
+        return key in self.active
+
+    def __len__(self):
+        return len(self.active)
+
+    def is_sleeping(self, key):
+        return key in self._watched
+
+    def _unwatch(self, key):
+        for cell in self._watched.pop(key, ()):
+            watchers = self._watchers.get(cell)
+            if watchers:
+                watchers.discard(key)
+                if not watchers:
+                    del self._watchers[cell]
+
+    def wake(self, key):
+        """Make an entity active (again)."""
+        self._unwatch(key)
+        self.active.add(key)
+
+    def sleep(self, key, cells=()):
+        """Deactivate an entity until one of `cells` changes or it is woken directly."""
+        self.active.discard(key)
+        self._unwatch(key)
+        cells = tuple(cells)
+        self._watched[key] = cells
+        for cell in cells:
+            self._watchers.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        """Forget an entity, awake or asleep."""
+        self.active.discard(key)
+        self._unwatch(key)
+
+    def clear(self):
+        self.active.clear()
+        self._watched.clear()
+        self._watchers.clear()
+
+    def notify(self, cell):
+        """Wake every entity watching a cell. Returns the keys woken."""
+        woken = self._watchers.get(cell)
+        if not woken:
+            return ()
+        woken = list(woken)
+        for key in woken:
+            self.wake(key)
+        return woken
@@ -0,0 +1,103 @@
+class ConveyorGraph:
+    """Successor links between conveyors, compiled from their positions and directions.
+
+    Each conveyor (keyed by its origin) outputs into the cell just past its
+    footprint in its direction. When that cell belongs to another conveyor,
+    that conveyor is its successor; otherwise the cell is kept so items can
+    be delivered to whatever is there (storage, machine). Links are updated
+    incrementally when a conveyor is placed, rotated or removed.
+    """
+
+    def __init__(self, conveyors, multi_block_system=None):
+        self.conveyors = conveyors  # ConveyorSystem.conveyors, shared
+        self.multi_block_system = multi_block_system
+        self.footprints = {}  # {origin: (width, height)}
+        self.output_cells = {}  # {origin: cell items leave the conveyor into}
+        self.successors = {}  # {origin: origin of the conveyor at its output cell}
+        self._feeders = {}  # {cell: set of origins outputting into it}
+
+    def get_footprint(self, x, y):
+        """Size in blocks of the conveyor at origin (x, y)."""
+        if self.multi_block_system:
+            data = self.multi_block_system.multi_blocks.get((x, y))
+            if data:
+                return data["size"]
+        return (1, 1)
+
+    def get_output_cell(self, x, y, direction, footprint=None):
+        """Cell just past a conveyor's footprint in its direction."""
+        width, height = footprint or self.get_footprint(x, y)
+        if direction == 0:  # Right
+            return (x + width, y)
+        elif direction == 1:  # Down
+            return (x, y + height)
+        elif direction == 2:  # Left
+            return (x - 1, y)
+        elif direction == 3:  # Up
+            return (x, y - 1)
+        return None
+
+    def find_conveyor(self, x, y):
+        """Origin of the registered conveyor covering a cell, or None."""
+        origin = None
+        if self.multi_block_system:
+            origin = self.multi_block_system.get_multi_block_origin(x, y)
+        origin = origin or (x, y)
+        return origin if origin in self.conveyors else None
+
+    def _unlink(self, origin):
+        cell = self.output_cells.pop(origin, None)
+        if cell is not None:
+            feeders = self._feeders.get(cell)
+            if feeders:
+                feeders.discard(origin)
+                if not feeders:
+                    del self._feeders[cell]
+        self.successors.pop(origin, None)
+
+    def _link(self, origin):
+        self._unlink(origin)
+        conveyor = self.conveyors.get(origin)
+        if conveyor is None:
+            return
+        cell = self.get_output_cell(*origin, conveyor["direction"], self.footprints.get(origin))
+        if cell is None:
+            return
+        self.output_cells[origin] = cell
+        self._feeders.setdefault(cell, set()).add(origin)
+        successor = self.find_conveyor(*cell)
+        if successor is not None and successor != origin:
+            self.successors[origin] = successor
+
+    def _footprint_cells(self, origin):
+        width, height = self.footprints.get(origin, (1, 1))
+        return [(origin[0] + dx, origin[1] + dy) for dx in range(width) for dy in range(height)]
+
+    def _relink_feeders(self, origin):
+        """Relink the conveyors that output into a conveyor's footprint."""
+        for cell in self._footprint_cells(origin):
+            for feeder in list(self._feeders.get(cell, ())):
+                self._link(feeder)
+
+    def update_conveyor(self, origin):
+        """Relink a conveyor that was placed or rotated, and the belts feeding into it."""
+        self.footprints[origin] = self.get_footprint(*origin)
+        self._link(origin)
+        self._relink_feeders(origin)
+
+    def remove_conveyor(self, origin):
+        """Drop a removed conveyor's links; belts that fed it now output into its empty cells."""
+        self._unlink(origin)
+        self._relink_feeders(origin)
+        self.footprints.pop(origin, None)
+
+    def rebuild(self):
+        """Compile the whole graph from the conveyors dict."""
+        self.footprints.clear()
+        self.output_cells.clear()
+        self.successors.clear()
+        self._feeders.clear()
+        for origin in self.conveyors:
+            self.footprints[origin] = self.get_footprint(*origin)
+        for origin in self.conveyors:
+            self._link(origin)
@@ -0,0 +1,113 @@
+import numpy as np
+
+MIN_ITEM_GAP = 0.2  # An item only enters a belt whose last item is further along than this
+
+class ConveyorItemStore:
+    """Items on conveyor belts, stored as parallel NumPy arrays (one row per item).
+
+    Rows 0..size-1 are live items; each one records its item ID, count, the
+    index of the belt it is on and its position along that belt (0.0 to 1.0).
+    advance() moves every item and resolves belt-to-belt transfers in a few
+    vectorized operations instead of a Python loop over item objects.
+    """
+
+    def __init__(self, capacity=256):
+        self.size = 0
+        self.settled = True  # Nothing moved in the last advance and no item was added or removed since
+        self.item_id = np.zeros(capacity, dtype=np.int32)
+        self.count = np.zeros(capacity, dtype=np.int32)
+        self.belt = np.zeros(capacity, dtype=np.int32)
+        self.position = np.zeros(capacity, dtype=np.float64)
+        self.previous_position = np.zeros(capacity, dtype=np.float64)  # Before the last advance, for interpolation
+
+    def _grow(self):
+        capacity = max(256, len(self.item_id) * 2)
+        for name in ("item_id", "count", "belt", "position", "previous_position"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def add(self, belt, item_id, count=1, position=0.0):
+        """Put an item on a belt."""
+        if self.size == len(self.item_id):
+            self._grow()
+        row = self.size
+        self.item_id[row] = item_id
+        self.count[row] = count
+        self.belt[row] = belt
+        self.position[row] = self.previous_position[row] = position
+        self.size += 1
+        self.settled = False
+
+    def remove(self, rows):
+        """Delete items by row. Rows of the remaining items change."""
+        if len(rows) == 0:
+            return
+        keep = np.ones(self.size, dtype=bool)
+        keep[rows] = False
+        remaining = int(keep.sum())
+        for array in (self.item_id, self.count, self.belt, self.position, self.previous_position):
+            array[:remaining] = array[:self.size][keep]
+        self.size = remaining
+        self.settled = False
+
+    def remove_belt(self, belt):
+        """Delete every item on a belt."""
+        self.remove(np.flatnonzero(self.belt[:self.size] == belt))
+
+    def rows_on_belts(self, belts):
+        """Rows of the items on any of the given belts."""
+        return np.flatnonzero(np.isin(self.belt[:self.size], belts))
+
+    def get_interpolated_positions(self, rows, alpha):
+        """Positions of some items, alpha of the way from their previous ones."""
+        previous = self.previous_position[rows]
+        return previous + (self.position[rows] - previous) * alpha
+
+    def advance(self, distance, successors):
+        """Move every item `distance` along its belt and hand items over at belt ends.
+
+        successors[belt] is the index of the belt it feeds, or -1. Each belt
+        takes at most one new item per advance, the one furthest along, and
+        only if its last item is more than MIN_ITEM_GAP in. Items that cannot
+        move on wait at position 1.0; once every item waits, `settled` stays
+        True and further advances would change nothing. Returns the rows of the waiting items on
+        belts with no successor, which the caller may deliver elsewhere.
+        """
+        n = self.size
+        self.settled = True
+        if n == 0:
+            return np.zeros(0, dtype=np.intp)
+        position = self.position[:n]
+        belt = self.belt[:n]
+        self.previous_position[:n] = position
+        position += distance
+
+        arrived = np.flatnonzero(position >= 1.0)
+        if len(arrived) == 0:
+            self.settled = False
+            return arrived
+        targets = successors[belt[arrived]]
+
+        # Last item of each belt, after moving
+        rear = np.full(len(successors), np.inf)
+        np.minimum.at(rear, belt, position)
+        movable = arrived[(targets >= 0) & (rear[targets] > MIN_ITEM_GAP)]
+        if len(movable):
+            # One item per receiving belt: the furthest along (stable sort keeps older items first)
+            movable = movable[np.argsort(-position[movable], kind="stable")]
+            movable_targets = successors[belt[movable]]
+            _, first = np.unique(movable_targets, return_index=True)
+            moved = movable[first]
+            belt[moved] = movable_targets[first]
+            position[moved] = 0.0
+            self.previous_position[moved] = 0.0
+            self.settled = False
+
+        # Everything else that arrived waits at the end of its belt
+        waiting = arrived[position[arrived] >= 1.0]
+        position[waiting] = 1.0
+        if self.settled and len(waiting) < n:
+            self.settled = False  # Some items are still on their way
+        return waiting[successors[belt[waiting]] < 0]
@@ -1,19 +1,11 @@
 import pygame
 import time
+import numpy as np
 from core import config
-
-class ConveyorItem:
-    """Represents an item moving on a conveyor belt."""
-    def __init__(self, item_id, count=1):
-        self.item_id = item_id
-        self.count = count
-        self.position = 0.0  # Position on the belt (0.0 to 1.0)
-        self.destination = None  # Used for vertical conveyors
-    
-    def advance(self, speed):
-        """Move the item along the belt."""
-        self.position += speed
-        return self.position >= 1.0  # Return True if item reached the end
+from utils.surface_format import convert_surface, on_display_change
+from systems.conveyor_graph import ConveyorGraph
+from systems.conveyor_items import ConveyorItemStore
+from systems.active_set import ActiveSet, on_cell_change, notify_cell_change
 
 class ConveyorSystem:
     def __init__(self, get_block_at, set_block_at, multi_block_system=None):
@@ -24,6 +16,24 @@ class ConveyorSystem:
         
         # Dictionary of conveyors: {(x, y): ConveyorData}
         self.conveyors = {}
+        # Conveyor positions bucketed by chunk, to find the belts on screen: {(chunk_x, chunk_y): set of (x, y)}
+        self.conveyor_grid = {}
+        # Successor links between conveyors, kept up to date on place, rotate and remove
+        self.graph = ConveyorGraph(self.conveyors, multi_block_system)
+        
+        # Every item on every belt, as arrays; belts are numbered in registration order
+        self.items = ConveyorItemStore()
+        self.belt_origins = []  # {belt index: origin}, None for removed conveyors
+        self._free_belts = []  # Indices of removed conveyors, reused by the next ones placed
+        self._belt_arrays = None  # (successor, x, y, direction) per belt index, rebuilt after changes
+        # Belts whose destination refused an item sleep until it changes; `active` holds the ones just woken
+        self.blocked_belts = ActiveSet()
+        on_cell_change(self.blocked_belts.notify)
+        
+        # Item sprites scaled once per item ID: {item_id: surface}
+        self.item_sprites = {}
+        self._item_sprites_source = None  # block_surfaces the sprites were scaled from
+        on_display_change(self.clear_item_sprites)
         
         # Get conveyor block IDs with fallbacks
         self.conveyor_id = getattr(config, "CONVEYOR_BELT", 17)
@@ -49,13 +59,30 @@ class ConveyorSystem:
         block_type = self.get_block_at(x, y)
         is_vertical = block_type == self.vertical_conveyor_id
         
+        # Re-registering a conveyor keeps its belt index but drops its items
+        if (x, y) in self.conveyors:
+            belt = self.conveyors[(x, y)]["belt"]
+            self.items.remove_belt(belt)
+            self.blocked_belts.remove(belt)
+        elif self._free_belts:
+            belt = self._free_belts.pop()
+            self.belt_origins[belt] = (x, y)
+        else:
+            belt = len(self.belt_origins)
+            self.belt_origins.append((x, y))
+        
         # Create conveyor data
         self.conveyors[(x, y)] = {
             "direction": direction,  # 0: right, 1: down, 2: left, 3: up
-            "items": [],  # List of ConveyorItem objects
+            "belt": belt,  # Index of the belt in the item store
             "is_vertical": is_vertical,
             "last_processed": time.time()
         }
+        grid_key = (x // config.CHUNK_SIZE, y // config.CHUNK_SIZE)
+        self.conveyor_grid.setdefault(grid_key, set()).add((x, y))
+        self.graph.update_conveyor((x, y))
+        self._belt_arrays = None
+        self._notify_placement(x, y)
         print(f"Conveyor registered at ({x}, {y}) with direction {direction}")
         return True
     
@@ -70,11 +97,19 @@ class ConveyorSystem:
             x, y = origin
             
         if (x, y) in self.conveyors:
-            item = ConveyorItem(item_id, count)
-            self.conveyors[(x, y)]["items"].append(item)
+            self.items.add(self.conveyors[(x, y)]["belt"], item_id, count)
             return True
         return False
     
+    def get_items(self, x, y):
+        """Items on the conveyor at origin (x, y), as (item_id, count, position) tuples."""
+        conveyor = self.conveyors.get((x, y))
+        if conveyor is None:
+            return []
+        rows = self.items.rows_on_belts([conveyor["belt"]])
+        return list(zip(self.items.item_id[rows].tolist(), self.items.count[rows].tolist(),
+                        self.items.position[rows].tolist()))
+    
     def rotate_conveyor(self, x, y):
         """Rotate a conveyor to change its direction."""
         # Check if this is part of a multi-block
@@ -88,127 +123,205 @@ class ConveyorSystem:
         if (x, y) in self.conveyors:
             # Update direction (0 → 1 → 2 → 3 → 0)
             self.conveyors[(x, y)]["direction"] = (self.conveyors[(x, y)]["direction"] + 1) % 4
+            self.graph.update_conveyor((x, y))
+            self._belt_arrays = None
+            self.blocked_belts.wake(self.conveyors[(x, y)]["belt"])  # It outputs somewhere else now
             return True
         return False
     
-    def get_next_position(self, x, y, direction):
-        """Get the next conveyor or machine position in the specified direction."""
-        if direction == 0:  # Right
-            next_pos = (x + 1, y)
-        elif direction == 1:  # Down
-            next_pos = (x, y + 1)
-        elif direction == 2:  # Left
-            next_pos = (x - 1, y)
-        elif direction == 3:  # Up
-            next_pos = (x, y - 1)
-        else:
-            return None
+    def remove_conveyor(self, x, y):
+        """Unregister a conveyor (any block of it); its items are lost."""
+        origin = None
+        if self.multi_block_system:
+            origin = self.multi_block_system.get_multi_block_origin(x, y)
         
-        # Check if next position is a valid destination
-        block_type = self.get_block_at(*next_pos)
-        if block_type in [self.conveyor_id, self.vertical_conveyor_id]:
-            return next_pos
+        if origin:
+            x, y = origin
         
-        # Check if next position is a valid machine or storage
-        # This would need to interface with other systems like storage_system
-        # For now, just return the position and let the update method handle it
-        return next_pos
+        if (x, y) not in self.conveyors:
+            return False
+        belt = self.conveyors.pop((x, y))["belt"]
+        self.items.remove_belt(belt)
+        self.blocked_belts.remove(belt)
+        self.belt_origins[belt] = None
+        self._free_belts.append(belt)
+        self._belt_arrays = None
+        grid_key = (x // config.CHUNK_SIZE, y // config.CHUNK_SIZE)
+        self.conveyor_grid.get(grid_key, set()).discard((x, y))
+        self.graph.remove_conveyor((x, y))
+        self._notify_placement(x, y)
+        return True
+    
+    def _notify_placement(self, x, y):
+        """Wake what sleeps around a conveyor placed or removed at origin (x, y), like extractors."""
+        width, height = self.graph.get_footprint(x, y)
+        notify_cell_change(x, y, width, height)
+    
+    def get_next_position(self, x, y, direction):
+        """Get the cell just past the conveyor at origin (x, y) in the specified direction."""
+        return self.graph.get_output_cell(x, y, direction)
+    
+    def get_belt_arrays(self):
+        """(successor, x, y, direction) arrays indexed by belt, rebuilt after conveyors change."""
+        if self._belt_arrays is None:
+            belt_count = len(self.belt_origins)
+            successor = np.full(belt_count, -1, dtype=np.int32)
+            belt_x = np.zeros(belt_count, dtype=np.int64)
+            belt_y = np.zeros(belt_count, dtype=np.int64)
+            direction = np.zeros(belt_count, dtype=np.int8)
+            for (x, y), conveyor in self.conveyors.items():
+                belt = conveyor["belt"]
+                belt_x[belt], belt_y[belt] = x, y
+                direction[belt] = conveyor["direction"]
+                next_origin = self.graph.successors.get((x, y))
+                if next_origin is not None:
+                    successor[belt] = self.conveyors[next_origin]["belt"]
+            self._belt_arrays = (successor, belt_x, belt_y, direction)
+        return self._belt_arrays
     
     def update(self, dt, storage_system=None, machine_system=None):
-        """Update all conveyor belts and move items along them."""
-        current_time = time.time()
+        """Move every item along its belt in one vectorized step.
+
+        Belt-to-belt transfers are resolved in bulk by the item store using
+        the graph's successor links. Only items waiting at the end of a belt
+        that outputs into something other than a conveyor are handled one by
+        one, since they need the world (storage chest or machine).
+
+        Once every item waits at a blocked belt end, updates are skipped
+        until an item is added, a conveyor changes or a destination wakes a
+        blocked belt.
+        """
+        if self.items.settled and self._belt_arrays is not None and not self.blocked_belts.active:
+            return
+        self.blocked_belts.active.clear()
+        successor = self.get_belt_arrays()[0]
+        waiting = self.items.advance(self.speed * dt, successor)
+        if len(waiting):
+            self._deliver_waiting(waiting, storage_system, machine_system)
+    
+    def _deliver_waiting(self, rows, storage_system, machine_system):
+        """Deliver items waiting at belt ends, oldest first, until a belt's destination refuses one."""
+        belts = self.items.belt[rows]
+        order = np.argsort(belts, kind="stable")
+        rows, belts = rows[order], belts[order]
+        _, starts = np.unique(belts, return_index=True)
         
-        # Process each conveyor
-        for pos, conveyor in self.conveyors.items():
-            # Skip if no items on this conveyor
-            if not conveyor["items"]:
+        delivered = []
+        for group in np.split(rows, starts[1:]):
+            belt = int(self.items.belt[group[0]])
+            if self.blocked_belts.is_sleeping(belt):
                 continue
-            
-            x, y = pos
-            direction = conveyor["direction"]
-            next_pos = self.get_next_position(x, y, direction)
-            
-            # Process items from end to beginning (to avoid conflicts)
-            items_to_remove = []
-            
-            for i, item in enumerate(reversed(conveyor["items"])):
-                item_index = len(conveyor["items"]) - 1 - i
-                
-                # Move the item along the belt
-                if item.advance(self.speed * dt):
-                    # Item reached the end of this conveyor
-                    if next_pos:
-                        # Check destination type
-                        dest_block = self.get_block_at(*next_pos)
-                        
-                        if dest_block == self.conveyor_id or dest_block == self.vertical_conveyor_id:
-                            # Transfer to next conveyor if it exists in our system
-                            if next_pos in self.conveyors:
-                                # Check if the next conveyor has space
-                                next_conveyor = self.conveyors[next_pos]
-                                if not next_conveyor["items"] or next_conveyor["items"][0].position > 0.2:
-                                    # Reset position and add to next conveyor
-                                    item.position = 0.0
-                                    next_conveyor["items"].insert(0, item)
-                                    items_to_remove.append(item_index)
-                        
-                        # Handle storage destination
-                        elif storage_system and dest_block == storage_system.storage_chest_id:
-                            # Try to add to storage
-                            if storage_system.add_item_to_storage(*next_pos, item.item_id, item.count):
-                                items_to_remove.append(item_index)
-                        
-                        # Handle machine destination (like ore processor)
-                        elif machine_system and dest_block == machine_system.ore_processor_id:
-                            if machine_system.add_item_to_machine(next_pos, item.item_id, item.count):
-                                items_to_remove.append(item_index)
-            
-            # Remove items that were transferred
-            for index in sorted(items_to_remove, reverse=True):
-                if 0 <= index < len(conveyor["items"]):
-                    conveyor["items"].pop(index)
-    
-    def draw_items(self, screen, camera_x, camera_y, block_surfaces):
-        """Draw items on conveyor belts."""
-        for (x, y), conveyor in self.conveyors.items():
-            # Get conveyor size from multi-block system if available
-            conveyor_width, conveyor_height = 2, 2  # Default to 2x2
-            
-            for item in conveyor["items"]:
-                # Calculate item position on the belt
-                if conveyor["direction"] == 0:  # Right
-                    item_x = x * config.PIXEL_SIZE + item.position * conveyor_width * config.PIXEL_SIZE
-                    item_y = y * config.PIXEL_SIZE + config.PIXEL_SIZE / 2
-                elif conveyor["direction"] == 1:  # Down
-                    item_x = x * config.PIXEL_SIZE + config.PIXEL_SIZE / 2
-                    item_y = y * config.PIXEL_SIZE + item.position * conveyor_height * config.PIXEL_SIZE
-                elif conveyor["direction"] == 2:  # Left
-                    item_x = x * config.PIXEL_SIZE + (1 - item.position) * conveyor_width * config.PIXEL_SIZE
-                    item_y = y * config.PIXEL_SIZE + config.PIXEL_SIZE / 2
-                elif conveyor["direction"] == 3:  # Up
-                    item_x = x * config.PIXEL_SIZE + config.PIXEL_SIZE / 2
-                    item_y = y * config.PIXEL_SIZE + (1 - item.position) * conveyor_height * config.PIXEL_SIZE
-                
-                # Draw the item (adjust based on your rendering system)
-                screen_x = item_x - camera_x
-                screen_y = item_y - camera_y
-                
-                # Draw a small square representing the item
-                item_size = int(config.PIXEL_SIZE * 0.6)  # Slightly smaller than a block
-                
-                if item.item_id in block_surfaces:
-                    # Draw using the block's texture but smaller
-                    surface = pygame.transform.scale(block_surfaces[item.item_id], (item_size, item_size))
-                    screen.blit(surface, (screen_x + (config.PIXEL_SIZE - item_size) // 2, 
-                                         screen_y + (config.PIXEL_SIZE - item_size) // 2))
-                else:
-                    # Fallback: draw a colored square
-                    item_color = (255, 255, 255)  # Default white
-                    if item.item_id in config.BLOCKS:
-                        item_color = config.BLOCKS[item.item_id]["color"]
-                    
-                    pygame.draw.rect(screen, item_color, (
-                        screen_x + (config.PIXEL_SIZE - item_size) // 2, 
-                        screen_y + (config.PIXEL_SIZE - item_size) // 2, 
-                        item_size, item_size
-                    ))
+            origin = self.belt_origins[belt]
+            for row in group.tolist():
+                if not self._deliver(origin, int(self.items.item_id[row]), int(self.items.count[row]),
+                                     storage_system, machine_system):
+                    # The rest of this belt is stuck behind it until the destination changes
+                    self.blocked_belts.sleep(belt, self._get_destination_cells(origin, machine_system))
+                    break
+                delivered.append(row)
+        self.items.remove(delivered)
+    
+    def _get_destination_cells(self, pos, machine_system):
+        """Cells whose change may unblock a belt: its output cell and the origin of what is there."""
+        next_pos = self.graph.output_cells.get(pos)
+        if next_pos is None:
+            return []
+        cells = [next_pos]
+        origin = self.multi_block_system.get_multi_block_origin(*next_pos) if self.multi_block_system else None
+        if origin is None and machine_system:
+            origin = machine_system.get_machine_origin(*next_pos)
+        if origin is not None and origin != next_pos:
+            cells.append(origin)
+        return cells
+    
+    def _deliver(self, pos, item_id, count, storage_system, machine_system):
+        """Hand an item at the end of a belt to the storage or machine it outputs into."""
+        next_pos = self.graph.output_cells.get(pos)
+        if next_pos is None:
+            return False
+        dest_block = self.get_block_at(*next_pos)
+        
+        # Handle storage destination
+        if storage_system and dest_block == storage_system.storage_chest_id:
+            return storage_system.add_item_to_storage(*next_pos, item_id, count)
+        
+        # Handle machine destination (like ore processor)
+        if machine_system and dest_block == machine_system.ore_processor_id:
+            machine_pos = machine_system.get_machine_origin(*next_pos)
+            if machine_pos:
+                return machine_system.add_item_to_machine(machine_pos, item_id, count)
+        return False
+    
+    def clear_item_sprites(self):
+        """Forget the scaled item sprites, e.g. after a display mode change."""
+        self.item_sprites = {}
+    
+    def get_item_sprite(self, item_id, block_surfaces):
+        """Item sprite scaled to belt size, built once per item ID."""
+        if self._item_sprites_source is not block_surfaces:
+            self.item_sprites = {}
+            self._item_sprites_source = block_surfaces
+        sprite = self.item_sprites.get(item_id)
+        if sprite is None:
+            item_size = int(config.PIXEL_SIZE * 0.6)  # Slightly smaller than a block
+            if item_id in block_surfaces:
+                # The block's texture but smaller
+                sprite = pygame.transform.scale(block_surfaces[item_id], (item_size, item_size))
+            else:
+                # Fallback: a colored square
+                item_color = (255, 255, 255)  # Default white
+                if item_id in config.BLOCKS:
+                    item_color = config.BLOCKS[item_id]["color"]
+                sprite = convert_surface(pygame.Surface((item_size, item_size)), alpha=False)
+                sprite.fill(item_color)
+            self.item_sprites[item_id] = sprite
+        return sprite
+    
+    def get_visible_conveyors(self, camera_x, camera_y, width, height, margin=2):
+        """Positions of the conveyors in the camera rectangle, plus `margin` blocks around it."""
+        min_x = int(camera_x // config.PIXEL_SIZE) - margin
+        min_y = int(camera_y // config.PIXEL_SIZE) - margin
+        max_x = int((camera_x + width) // config.PIXEL_SIZE) + margin
+        max_y = int((camera_y + height) // config.PIXEL_SIZE) + margin
+        
+        visible = []
+        for chunk_y in range(min_y // config.CHUNK_SIZE, max_y // config.CHUNK_SIZE + 1):
+            for chunk_x in range(min_x // config.CHUNK_SIZE, max_x // config.CHUNK_SIZE + 1):
+                for x, y in self.conveyor_grid.get((chunk_x, chunk_y), ()):
+                    if min_x <= x <= max_x and min_y <= y <= max_y:
+                        visible.append((x, y))
+        return visible
+    
+    def draw_items(self, screen, camera_x, camera_y, block_surfaces, alpha=1.0):
+        """Draw items on the conveyor belts visible on screen, in one batched blit.
+
+        alpha interpolates each item between its previous and current position
+        (see SimulationScheduler.get_alpha).
+        """
+        # Items are drawn up to a belt length (2 blocks) past their conveyor's origin
+        visible = self.get_visible_conveyors(camera_x, camera_y, screen.get_width(), screen.get_height())
+        if not visible or not self.items.size:
+            return
+        rows = self.items.rows_on_belts([self.conveyors[pos]["belt"] for pos in visible])
+        if not len(rows):
+            return
+        
+        _, belt_x, belt_y, belt_direction = self.get_belt_arrays()
+        belts = self.items.belt[rows]
+        direction = belt_direction[belts]
+        position = self.items.get_interpolated_positions(rows, alpha)
+        
+        # Calculate item positions on the belts (2x2 conveyors)
+        item_size = int(config.PIXEL_SIZE * 0.6)
+        offset = (config.PIXEL_SIZE - item_size) // 2
+        conveyor_length = 2 * config.PIXEL_SIZE
+        along = np.where(direction >= 2, 1 - position, position) * conveyor_length  # Left and up run backwards
+        across = config.PIXEL_SIZE / 2
+        horizontal = direction % 2 == 0
+        item_x = belt_x[belts] * config.PIXEL_SIZE - camera_x + offset + np.where(horizontal, along, across)
+        item_y = belt_y[belts] * config.PIXEL_SIZE - camera_y + offset + np.where(horizontal, across, along)
+        
+        item_ids = self.items.item_id[rows].tolist()
+        sprites = {item_id: self.get_item_sprite(item_id, block_surfaces) for item_id in set(item_ids)}
+        screen.blits([(sprites[item_id], (x, y))
+                      for item_id, x, y in zip(item_ids, item_x.tolist(), item_y.tolist())], doreturn=False)
@@ -1,17 +1,30 @@
 import time
 import random
 from core import config
+from systems.active_set import ActiveSet, on_cell_change
+from systems.timer_queue import TimerQueue
 
 class ExtractorSystem:
-    def __init__(self, get_block_at, set_block_at, storage_system, conveyor_system, multi_block_system=None):
+    def __init__(self, get_block_at, set_block_at, storage_system, conveyor_system, multi_block_system=None,
+                 get_time=time.time, timers=None):
         self.get_block_at = get_block_at
         self.set_block_at = set_block_at
         self.storage_system = storage_system
         self.conveyor_system = conveyor_system
         self.multi_block_system = multi_block_system
+        self.get_time = get_time  # Horloge de simulation (temps réel par défaut)
+        # Prochaines extractions programmées sur get_time(); sans file partagée
+        # (SimulationScheduler.timers), le système a la sienne et l'exécute dans update()
+        self._owns_timers = timers is None
+        self.timers = TimerQueue() if timers is None else timers
+        self.extraction_timers = {}  # {(x, y): timer de la prochaine extraction}
         
         # Dictionnaire pour suivre tous les extracteurs actifs
         self.extractors = {}  # {(x, y): { "last_extraction": timestamp, "interval": seconds }}
+        # Seuls les extracteurs actifs sont vérifiés; les autres dorment jusqu'à un changement
+        # autour d'eux (coffre ou convoyeur posé, coffre rempli)
+        self.active = ActiveSet()
+        on_cell_change(self.active.notify)
         
         # Configuration des extracteurs
         self.extraction_interval = 2.0  # Temps en secondes entre chaque extraction
@@ -30,10 +43,11 @@ class ExtractorSystem:
         # Ajouter l'extracteur avec un temps d'extraction initial aléatoire
         # pour éviter que tous les extracteurs fonctionnent en même temps
         self.extractors[(x, y)] = {
-            "last_extraction": time.time() - random.random() * self.extraction_interval,
+            "last_extraction": self.get_time() - random.random() * self.extraction_interval,
             "interval": self.extraction_interval,
             "direction": 0  # 0:droite, 1:bas, 2:gauche, 3:haut
         }
+        self.active.wake((x, y))
         print(f"Extracteur enregistré à ({x}, {y})")
         return True
     
@@ -41,66 +55,96 @@ class ExtractorSystem:
         """Définit la direction d'extraction (0-3)."""
         if (x, y) in self.extractors:
             self.extractors[(x, y)]["direction"] = direction % 4
+            self.active.wake((x, y))
             return True
         return False
     
     def update(self, dt):
-        """Met à jour tous les extracteurs, extrait les items et les place sur les convoyeurs."""
-        current_time = time.time()
+        """Met à jour les extracteurs actifs, extrait les items et les place sur les convoyeurs."""
+        current_time = self.get_time()
+        if self._owns_timers:
+            self.timers.run_due(current_time)
         
-        for pos, extractor in self.extractors.items():
+        for pos in list(self.active.active):
+            extractor = self.extractors.get(pos)
+            if extractor is None:
+                self.active.remove(pos)
+                continue
+            # Vérifier si c'est le moment d'extraire, sinon dormir jusque-là
+            if current_time - extractor["last_extraction"] < extractor["interval"]:
+                self._sleep_until(pos, extractor["last_extraction"] + extractor["interval"])
+                continue
+            
             x, y = pos
-            # Vérifier si c'est le moment d'extraire
-            if current_time - extractor["last_extraction"] >= extractor["interval"]:
-                # Chercher un coffre de stockage adjacent
-                storage_pos = self._find_adjacent_storage(x, y)
-                if storage_pos:
-                    # Trouver un convoyeur dans la direction d'extraction
-                    conveyor_pos = self._find_conveyor_in_direction(x, y, extractor["direction"])
-                    if conveyor_pos:
-                        # Extraire un item du stockage et le placer sur le convoyeur
-                        item_extracted = self._extract_and_place(storage_pos, conveyor_pos)
-                        if item_extracted:
-                            # Mise à jour du temps de dernière extraction
-                            extractor["last_extraction"] = current_time
+            # Chercher un coffre de stockage adjacent
+            storage_pos = self._find_adjacent_storage(x, y)
+            if not storage_pos:
+                # Dormir jusqu'à ce qu'un bloc soit posé autour de l'extracteur
+                self.active.sleep(pos, self._get_adjacent_cells(x, y))
+                continue
+            
+            # Trouver un convoyeur dans la direction d'extraction
+            conveyor_pos = self._find_conveyor_in_direction(x, y, extractor["direction"])
+            if not conveyor_pos:
+                self.active.sleep(pos, [self._get_output_cell(x, y, extractor["direction"])])
+                continue
+            
+            # Extraire un item du stockage et le placer sur le convoyeur
+            if self._extract_and_place(storage_pos, conveyor_pos):
+                # Mise à jour du temps de dernière extraction
+                extractor["last_extraction"] = current_time
+                self._sleep_until(pos, current_time + extractor["interval"])
+            else:
+                # Coffre vide: dormir jusqu'à ce qu'il change
+                self.active.sleep(pos, [storage_pos])
+    
+    def _sleep_until(self, pos, deadline):
+        """Désactive l'extracteur jusqu'à son prochain temps d'extraction."""
+        self.active.sleep(pos)
+        self.timers.cancel(self.extraction_timers.get(pos))
+        self.extraction_timers[pos] = self.timers.schedule(deadline, self._wake, pos)
+    
+    def _wake(self, pos):
+        self.extraction_timers.pop(pos, None)
+        self.active.wake(pos)
+    
+    def _get_adjacent_cells(self, x, y):
+        """Cellules autour de l'extracteur (2x2) où un coffre peut être trouvé."""
+        width, height = 2, 2
+        return [(x-1, y), (x-1, y+1), (x+width, y), (x+width, y+1),
+                (x, y-1), (x+1, y-1), (x, y+height), (x+1, y+height)]
     
     def _find_adjacent_storage(self, x, y):
         """Trouve un stockage adjacent à l'extracteur."""
-        # L'extracteur est de taille 2x2, vérifier autour de lui
-        width, height = 2, 2  # Taille standard de l'extracteur
-        
-        # Vérifier les quatre côtés de l'extracteur
-        directions = [
-            [(x-1, y), (x-1, y+1)],  # Gauche
-            [(x+width, y), (x+width, y+1)],  # Droite
-            [(x, y-1), (x+1, y-1)],  # Haut
-            [(x, y+height), (x+1, y+height)]  # Bas
-        ]
-        
-        for points in directions:
-            for px, py in points:
-                if self.get_block_at(px, py) == config.STORAGE_CHEST:
-                    # Trouver l'origine du coffre si c'est un multi-bloc
-                    if self.multi_block_system:
-                        origin = self.multi_block_system.get_multi_block_origin(px, py)
-                        if origin:
-                            return origin
-                    return (px, py)
+        # L'extracteur est de taille 2x2, vérifier les quatre côtés autour de lui
+        for px, py in self._get_adjacent_cells(x, y):
+            if self.get_block_at(px, py) == config.STORAGE_CHEST:
+                # Trouver l'origine du coffre si c'est un multi-bloc
+                if self.multi_block_system:
+                    origin = self.multi_block_system.get_multi_block_origin(px, py)
+                    if origin:
+                        return origin
+                return (px, py)
         return None
     
-    def _find_conveyor_in_direction(self, x, y, direction):
-        """Trouve un convoyeur dans la direction spécifiée."""
+    def _get_output_cell(self, x, y, direction):
+        """Cellule juste à côté de l'extracteur dans sa direction."""
         width, height = 2, 2  # Taille standard de l'extracteur
         
         if direction == 0:  # Droite
-            check_pos = (x + width, y)
+            return (x + width, y)
         elif direction == 1:  # Bas
-            check_pos = (x, y + height)
+            return (x, y + height)
         elif direction == 2:  # Gauche
-            check_pos = (x - 1, y)
+            return (x - 1, y)
         elif direction == 3:  # Haut
-            check_pos = (x, y - 1)
-        else:
+            return (x, y - 1)
+        return None
+    
+    def _find_conveyor_in_direction(self, x, y, direction):
+        """Trouve un convoyeur dans la direction spécifiée."""
+        check_pos = self._get_output_cell(x, y, direction)
+        if check_pos is None:
             return None
             
         check_x, check_y = check_pos
@@ -2,15 +2,26 @@ import time
 import json
 import os
 from core import config
+from systems.active_set import ActiveSet, notify_cell_change
+from systems.timer_queue import TimerQueue
 
 class MachineSystem:
-    def __init__(self, get_block_at, set_block_at):
+    def __init__(self, get_block_at, set_block_at, get_time=time.time, timers=None):
         # Store references to world interaction functions
         self.get_block_at = get_block_at
         self.set_block_at = set_block_at
+        # Clock used for processing times (the simulation clock when run by a SimulationScheduler)
+        self.get_time = get_time
+        # Processing completions are timers on get_time(); with no shared queue (SimulationScheduler.timers)
+        # the machine system keeps its own and runs it in update()
+        self._owns_timers = timers is None
+        self.timers = TimerQueue() if timers is None else timers
+        self.process_timers = {}  # {(x, y): timer of the machine's current process}
         
         # Dictionary to track machines: {(x, y): MachineData}
         self.machines = {}
+        # Machines woken by an item added or taken; the others sleep (processing ones wait on their timer)
+        self.active = ActiveSet()
         
         # Make sure ORE_PROCESSOR exists in config
         self.ore_processor_id = getattr(config, "ORE_PROCESSOR", 12)
@@ -81,6 +92,7 @@ class MachineSystem:
     
     def register_machine(self, x, y):
         """Register a new machine at the given position."""
+        self.timers.cancel(self.process_timers.pop((x, y), None))
         self.machines[(x, y)] = {
             "input": None,  # (block_type, count)
             "output": None,  # (block_type, count)
@@ -88,6 +100,9 @@ class MachineSystem:
             "process_duration": None  # Duration of current process
         }
         print(f"Machine registered at ({x}, {y})")
+        # Belts that were blocked against the empty cells can now deliver into it
+        width, height = self.get_machine_size(self.get_block_at(x, y))
+        notify_cell_change(x, y, width, height)
         return True
     
     def get_machine_size(self, block_type):
@@ -98,6 +113,8 @@ class MachineSystem:
         """Remove a machine from the registry."""
         if (x, y) in self.machines:
             machine = self.machines.pop((x, y))
+            self.active.remove((x, y))
+            self.timers.cancel(self.process_timers.pop((x, y), None))
             # Return any items in the machine to be dropped
             items = []
             if machine["input"]:
@@ -125,6 +142,10 @@ class MachineSystem:
         
         return False
     
+    def is_machine_origin(self, x, y):
+        """Check in O(1) whether a machine has its origin at the given position."""
+        return (x, y) in self.machines
+    
     def get_machine_origin(self, x, y):
         """Get the origin position of a machine at the given position."""
         # If this is already the origin, return it
@@ -167,12 +188,14 @@ class MachineSystem:
             
             # Check if input slot is empty or has same item
             if machine["input"] is None:
+                self.active.wake(machine_pos)
                 machine["input"] = (block_type, count)
                 # Check if we can process this item and start processing if possible
                 if block_type in self.recipes:
                     self.start_processing(machine_pos)
                 return True
             elif machine["input"][0] == block_type:
+                self.active.wake(machine_pos)
                 machine["input"] = (block_type, machine["input"][1] + count)
                 # Check if we were waiting for more input to start processing
                 if machine["process_start"] is None and block_type in self.recipes:
@@ -191,6 +214,9 @@ class MachineSystem:
             if machine[target_slot] is not None:
                 item = machine[target_slot]
                 machine[target_slot] = None
+                # A free output slot may let processing resume, a free input slot accepts new items
+                self.active.wake(machine_pos)
+                notify_cell_change(*machine_pos)
                 return item
         
         return None
@@ -211,70 +237,94 @@ class MachineSystem:
                 # Check if we have a recipe for this input
                 if input_type in self.recipes:
                     # Start processing
-                    machine["process_start"] = time.time()
+                    machine["process_start"] = self.get_time()
                     machine["process_duration"] = self.recipes[input_type]["process_time"]
+                    self.process_timers[machine_pos] = self.timers.schedule(
+                        machine["process_start"] + machine["process_duration"], self.finish_processing, machine_pos)
                     return True
         
         return False
     
     def update(self):
-        """Update all machines' processing status."""
-        current_time = time.time()
+        """Start processing on the machines woken by an item added or taken.
+
+        Machines that are processing finish through their timer (see
+        finish_processing), so they are not visited here.
+        """
+        if self._owns_timers:
+            self.timers.run_due(self.get_time())
         
-        for pos, machine in list(self.machines.items()):
-            # Skip machines that aren't processing
+        for pos in list(self.active.active):
+            machine = self.machines.get(pos)
+            if machine is None:
+                self.active.remove(pos)
+                continue
             if machine["process_start"] is None:
                 # Check if we can start processing (might have been waiting for materials)
                 if machine["input"] is not None and machine["input"][0] in self.recipes:
                     self.start_processing(pos)
-                continue
+            # Processing or not, nothing more to do until the timer or the next item added or taken
+            self.active.sleep(pos)
+    
+    def finish_processing(self, pos):
+        """Complete a machine's current process: consume one input, add the output, start the next."""
+        self.process_timers.pop(pos, None)
+        machine = self.machines.get(pos)
+        if machine is None or machine["process_start"] is None:
+            return
+        
+        if machine["input"] is None:
+            # Input taken out while processing
+            machine["process_start"] = None
+            machine["process_duration"] = None
+            return
+        
+        input_type, input_count = machine["input"]
+        
+        # Check if we still have a valid recipe
+        if input_type in self.recipes:
+            # Get recipe details
+            recipe = self.recipes[input_type]
             
-            # Check if processing is complete
-            if current_time >= machine["process_start"] + machine["process_duration"]:
-                input_type, input_count = machine["input"]
-                
-                # Check if we still have a valid recipe
-                if input_type in self.recipes:
-                    # Get recipe details
-                    recipe = self.recipes[input_type]
-                    
-                    # Consume one input item
-                    if input_count > 1:
-                        machine["input"] = (input_type, input_count - 1)
-                    else:
-                        machine["input"] = None
-                    
-                    # Generate output
-                    output_type = recipe["output"]
-                    output_count = recipe["output_count"]
-                    
-                    if machine["output"] is None:
-                        machine["output"] = (output_type, output_count)
-                    elif machine["output"][0] == output_type:
-                        machine["output"] = (output_type, machine["output"][1] + output_count)
-                    else:
-                        # Different output type - can't output
-                        pass
-                    
-                    # Reset processing
-                    machine["process_start"] = None
-                    machine["process_duration"] = None
-                    
-                    # If there's still input and no output slot conflict, start processing again
-                    if machine["input"] is not None:
-                        self.start_processing(pos)
+            # Consume one input item
+            if input_count > 1:
+                machine["input"] = (input_type, input_count - 1)
+            else:
+                machine["input"] = None
+            
+            # Generate output
+            output_type = recipe["output"]
+            output_count = recipe["output_count"]
+            
+            if machine["output"] is None:
+                machine["output"] = (output_type, output_count)
+            elif machine["output"][0] == output_type:
+                machine["output"] = (output_type, machine["output"][1] + output_count)
+            else:
+                # Different output type - can't output
+                pass
+            
+            # Reset processing
+            machine["process_start"] = None
+            machine["process_duration"] = None
+            
+            # If there's still input and no output slot conflict, start processing again
+            if machine["input"] is not None:
+                self.start_processing(pos)
+            else:
+                notify_cell_change(*pos)  # Input slot free for belts waiting on it
     
     def get_machine_data(self, machine_pos):
         """Get data about a specific machine."""
         return self.machines.get(machine_pos, None)
     
-    def get_machine_progress(self, machine_pos):
+    def get_machine_progress(self, machine_pos, now=None):
         """Get the current processing progress of a machine (0.0 to 1.0)."""
         if machine_pos in self.machines:
             machine = self.machines[machine_pos]
             
             if machine["process_start"] is not None and machine["process_duration"] > 0:
-                elapsed = time.time() - machine["process_start"]
+                elapsed = (self.get_time() if now is None else now) - machine["process_start"]
                 return min(1.0, elapsed / machine["process_duration"])
         
         return 0.0
@@ -2,6 +2,7 @@ import json
 import os
 import uuid
 from core import config
+from systems.active_set import notify_cell_change
 
 class StorageSystem:
     def __init__(self, get_block_at, set_block_at, multi_block_system=None):
@@ -19,6 +20,18 @@ class StorageSystem:
         
         # Get storage block IDs with fallbacks
         self.storage_chest_id = getattr(config, "STORAGE_CHEST", 16)
+        
+        # Bumped on every change, so saves can reuse the last serialized data
+        self.version = 0
+        self._save_data = None  # (version, get_save_data() result)
+    
+    def _notify_change(self, x, y, whole_chest=False):
+        """Wake what sleeps on this storage: extractors waiting for items, belts waiting for space."""
+        self.version += 1
+        width, height = 1, 1
+        if whole_chest and self.multi_block_system and (x, y) in self.multi_block_system.multi_blocks:
+            width, height = self.multi_block_system.multi_blocks[(x, y)]["size"]
+        notify_cell_change(x, y, width, height)
     
     def register_storage(self, x, y):
         """Register a new storage at the given position."""
@@ -48,6 +61,7 @@ class StorageSystem:
         self.storage_ids[storage_id] = (x, y)
         
         print(f"Storage registered at ({x}, {y}) with ID {storage_id}")
+        self._notify_change(x, y, whole_chest=True)
         return True
     
     def is_storage_position(self, x, y):
@@ -102,6 +116,7 @@ class StorageSystem:
             storage["items"][item_id] = count
         
         storage["used_space"] += count
+        self._notify_change(x, y)
         return True
     
     def take_item_from_storage(self, x, y, item_id, count=1):
@@ -131,6 +146,7 @@ class StorageSystem:
         if storage["items"][item_id] == 0:
             del storage["items"][item_id]
         
+        self._notify_change(x, y)
         return (item_id, count)
     
     def get_available_space(self, x, y):
@@ -149,8 +165,14 @@ class StorageSystem:
         storage = self.storages[(x, y)]
         return storage["capacity"] - storage["used_space"]
     
-    def save_to_file(self, filename="storage_data.json"):
-        """Save all storage data to a JSON file."""
+    def get_save_data(self):
+        """Return all storage data as a JSON-serializable dict, keyed by storage ID.
+
+        The dict is rebuilt only when a storage changed since the last call;
+        treat it as read-only.
+        """
+        if self._save_data is not None and self._save_data[0] == self.version:
+            return self._save_data[1]
         storage_data = {}
         
         for pos, storage in self.storages.items():
@@ -173,6 +195,12 @@ class StorageSystem:
                 "capacity": storage["capacity"],
                 "used_space": storage["used_space"]
             }
+        self._save_data = (self.version, storage_data)
+        return storage_data
+    
+    def save_to_file(self, filename="storage_data.json"):
+        """Save all storage data to a JSON file."""
+        storage_data = self.get_save_data()
         
         # Create data directory if it doesn't exist
         data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
@@ -189,11 +217,34 @@ class StorageSystem:
             print(f"Error saving storage data: {e}")
             return False
     
+    def load_from_save_data(self, storage_data):
+        """Restore storages from get_save_data() output.
+
+        Unlike load_from_file, chest blocks are not checked: with chunks
+        loaded on demand, the chunk under a chest may not be loaded yet.
+        """
+        self.storages = {}
+        self.storage_ids = {}
+        self.version += 1
+        for storage_id, data in storage_data.items():
+            x, y = data["position"]
+            self.storages[(x, y)] = {
+                "items": {int(item_id): count for item_id, count in data["items"].items()},
+                "capacity": data["capacity"],
+                "used_space": data["used_space"],
+                "linked_storages": [],  # Reset linked storages
+                "id": storage_id
+            }
+            self.storage_ids[storage_id] = (x, y)
+            self._notify_change(x, y, whole_chest=True)
+        print(f"Loaded {len(self.storages)} storage chests from save data")
+    
     def load_from_file(self, filename="storage_data.json"):
         """Load all storage data from a JSON file."""
         # Reset current data
         self.storages = {}
         self.storage_ids = {}
+        self.version += 1
         
         # Create data directory path
         data_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
@@ -230,6 +281,7 @@ class StorageSystem:
                 
                 # Add to ID mapping
                 self.storage_ids[storage_id] = (x, y)
+                self._notify_change(x, y, whole_chest=True)
             
             print(f"Loaded {len(self.storages)} storage chests from {filepath}")
             return True
@@ -0,0 +1,56 @@
+import heapq
+import itertools
+
+class TimerQueue:
+    """Deadlines on the simulation clock, kept in a heap so each tick only pops the due ones.
+
+    schedule() returns a timer that can be passed to cancel(); cancelled
+    timers stay in the heap and are skipped when they come up. Timers due at
+    the same time run in the order they were scheduled.
+    """
+
+    def __init__(self):
+        self._heap = []  # [deadline, sequence, callback, args], callback None when cancelled
+        self._sequence = itertools.count()
+        self._pending = 0
+
+    def __len__(self):
+        return self._pending
+
+    def schedule(self, deadline, callback, *args):
+        """Call callback(*args) at the first run_due() with now >= deadline."""
+        timer = [deadline, next(self._sequence), callback, args]
+        heapq.heappush(self._heap, timer)
+        self._pending += 1
+        return timer
+
+    def cancel(self, timer):
+        """Drop a timer that has not run yet (no effect on one that already ran)."""
+        if timer is not None and timer[2] is not None:
+            timer[2] = None
+            self._pending -= 1
+
+    def next_deadline(self):
+        """Time of the earliest pending timer, or None."""
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def clear(self):
+        self._heap = []
+        self._pending = 0
+
+    def run_due(self, now):
+        """Run every timer with deadline <= now, earliest first. Returns how many ran."""
+        ran = 0
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            timer = heapq.heappop(heap)
+            callback, args = timer[2], timer[3]
+            if callback is None:
+                continue  # Cancelled
+            timer[2] = None
+            self._pending -= 1
+            callback(*args)
+            ran += 1
+        return ran
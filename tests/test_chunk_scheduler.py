@@ -0,0 +1,65 @@
+import queue
+
+import pytest
+
+from world.chunk_scheduler import ChunkRequestScheduler
+
+
+def drain(scheduler):
+    popped = []
+    while True:
+        try:
+            chunk_x, chunk_y, _ = scheduler.get_nowait()
+        except queue.Empty:
+            return popped
+        popped.append((chunk_x, chunk_y))
+
+
+def test_nearest_first():
+    scheduler = ChunkRequestScheduler()
+    scheduler.set_focus(0, 0)
+    assert scheduler.request_many([(3, 0), (1, 1), (0, 0), (-2, 0)], seed=7) == 4
+    assert scheduler.get_nowait() == (0, 0, 7)
+    assert drain(scheduler) == [(1, 1), (-2, 0), (3, 0)]
+
+
+def test_no_duplicate_requests():
+    scheduler = ChunkRequestScheduler()
+    assert scheduler.request(1, 2, seed=0)
+    assert not scheduler.request(1, 2, seed=0)
+    assert scheduler.qsize() == 1
+
+    scheduler.get_nowait()
+    # Being generated: still not requested again until completed
+    assert scheduler.is_pending(1, 2)
+    assert not scheduler.request(1, 2, seed=0)
+    scheduler.complete([(1, 2)])
+    assert not scheduler.is_pending(1, 2)
+    assert scheduler.request(1, 2, seed=0)
+
+
+def test_cancel():
+    scheduler = ChunkRequestScheduler()
+    scheduler.request_many([(0, 0), (1, 0)], seed=0)
+    assert scheduler.cancel(0, 0)
+    assert not scheduler.cancel(0, 0)
+    assert not scheduler.is_pending(0, 0)
+    assert drain(scheduler) == [(1, 0)]
+
+
+def test_set_focus_reprioritizes_and_cancels_out_of_range():
+    scheduler = ChunkRequestScheduler()
+    scheduler.set_focus(0, 0, radius=2)
+    scheduler.request_many([(0, 0), (1, 0), (2, 0)], seed=0)
+    # Outside the radius: ignored
+    assert scheduler.request_many([(5, 0)], seed=0) == 0
+
+    scheduler.set_focus(3, 0, radius=2)
+    assert not scheduler.is_pending(0, 0)
+    assert drain(scheduler) == [(2, 0), (1, 0)]
+
+
+def test_get_times_out_when_empty():
+    scheduler = ChunkRequestScheduler()
+    with pytest.raises(queue.Empty):
+        scheduler.get(timeout=0.01)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from core import config
+from world import chunks
+
+
+def make_chunk(block):
+    return np.full((config.CHUNK_SIZE, config.CHUNK_SIZE), block, dtype=config.CHUNK_DTYPE)
+
+
+@pytest.fixture
+def world(tmp_path):
+    """Empty world with a chunk store in a temporary directory."""
+    for state in (chunks.loaded_chunks, chunks.chunk_versions, chunks.saved_versions,
+                  chunks.rendered_versions, chunks.dirty_cells):
+        state.clear()
+    while not chunks.generated_chunk_results.empty():
+        chunks.generated_chunk_results.get_nowait()
+    store = chunks.open_chunk_store(str(tmp_path / "world.json"))
+    yield store
+    store.close()
+    chunks.chunk_store = None
+    chunks.loaded_chunks.clear()
+
+
+def edit_and_unload(coords):
+    """Load a chunk, edit it, then unload it far away so it is written to the store."""
+    chunks.loaded_chunks[coords] = make_chunk(config.EMPTY)
+    chunks.bump_chunk_version(*coords)
+    chunks.saved_versions[coords] = chunks.chunk_versions[coords]
+    chunks.loaded_chunks[coords][0, 0] = config.DIRT
+    chunks.bump_chunk_version(*coords)
+    far = 1000 * config.CHUNK_SIZE * config.PIXEL_SIZE
+    assert chunks.unload_distant_chunks(far, far, 1) == 1
+
+
+@pytest.mark.parametrize("flush", [False, True])
+def test_unload_during_generation_keeps_edits(world, flush):
+    """A chunk unloaded while its region is generating comes back from the store, not the generator."""
+    edited, fresh = (1, 0), (0, 0)
+    chunks.chunk_scheduler.request_many([edited, fresh], config.SEED)
+    edit_and_unload(edited)
+    if flush:
+        assert world.flush(5.0)  # Written to disk, not just queued
+
+    # The process job finishes afterwards with generated terrain for both chunks
+    generated = [(x, y, make_chunk(config.STONE)) for x, y in (fresh, edited, (2, 0))]
+    chunks.generated_chunk_results.put(({edited, fresh}, generated))
+    chunks.integrate_generated_chunks()
+
+    assert chunks.loaded_chunks[edited][0, 0] == config.DIRT
+    assert not chunks.is_chunk_unsaved(*edited)
+    assert chunks.loaded_chunks[fresh][0, 0] == config.STONE
+    assert (2, 0) not in chunks.loaded_chunks  # Not requested from this region
@@ -0,0 +1,47 @@
+import numpy as np
+
+from systems.conveyor_items import ConveyorItemStore
+
+
+def test_items_move_to_the_next_belt():
+    items = ConveyorItemStore()
+    successors = np.array([1, -1])
+    items.add(0, item_id=3, position=0.9)
+    waiting = items.advance(0.2, successors)
+    assert len(waiting) == 0
+    assert items.belt[0] == 1 and items.position[0] == 0.0
+
+    # Waits at the end of the last belt and is reported to the caller
+    waiting = items.advance(1.5, successors)
+    assert list(waiting) == [0]
+    assert items.position[0] == 1.0
+
+
+def test_one_item_enters_a_belt_per_advance():
+    items = ConveyorItemStore()
+    successors = np.array([2, 2, -1])
+    items.add(0, item_id=1, position=0.95)
+    items.add(1, item_id=2, position=0.99)
+    items.advance(0.1, successors)
+    on_target = items.rows_on_belts([2])
+    assert list(items.item_id[on_target]) == [2]
+    assert items.position[items.rows_on_belts([0])[0]] == 1.0
+
+
+def test_settles_when_nothing_can_move():
+    items = ConveyorItemStore()
+    successors = np.array([-1])
+    items.add(0, item_id=1, position=0.5)
+    items.advance(0.6, successors)
+    items.advance(0.1, successors)
+    assert items.settled
+
+
+def test_remove_and_grow():
+    items = ConveyorItemStore(capacity=2)
+    for belt in range(5):
+        items.add(belt % 2, item_id=belt)
+    assert items.size == 5
+    items.remove_belt(0)
+    assert items.size == 2
+    assert sorted(items.item_id[:items.size]) == [1, 3]
@@ -0,0 +1,71 @@
+import zlib
+
+import numpy as np
+import pytest
+
+from core import config
+from world import region_storage
+from world.region_storage import RegionStore, decode_chunk, encode_chunk
+from world.uniform_chunk import UniformChunk
+
+SIZE = config.CHUNK_SIZE
+
+
+def assert_round_trip(chunk, expected_encoding=None):
+    encoding, payload = encode_chunk(chunk)
+    if expected_encoding is not None:
+        assert encoding == expected_encoding
+    decoded = decode_chunk(encoding, payload)
+    assert decoded.shape == (SIZE, SIZE)
+    assert decoded.dtype == np.dtype(config.CHUNK_DTYPE)
+    np.testing.assert_array_equal(decoded, np.asarray(chunk))
+
+
+@pytest.mark.parametrize("block_types", [1, 2, 3, 5, 16])
+def test_palette_round_trip(block_types):
+    rng = np.random.default_rng(block_types)
+    chunk = rng.integers(0, block_types, (SIZE, SIZE)).astype(config.CHUNK_DTYPE)
+    assert_round_trip(chunk)
+
+
+def test_noisy_chunk_round_trip():
+    """More than 16 block types cannot use a palette."""
+    chunk = (np.arange(SIZE * SIZE) % 40).reshape(SIZE, SIZE).astype(config.CHUNK_DTYPE)
+    assert region_storage.encode_palette(chunk) is None
+    assert_round_trip(chunk)
+
+
+def test_large_ids_round_trip():
+    chunk = np.arange(SIZE * SIZE, dtype=np.int32).reshape(SIZE, SIZE) + 1000
+    encoding, payload = encode_chunk(chunk)
+    assert encoding == region_storage.ENCODING_ZLIB_I32
+    cells = np.frombuffer(zlib.decompress(payload), dtype="<i4")
+    np.testing.assert_array_equal(cells.reshape(SIZE, SIZE), chunk)
+
+
+def test_uniform_chunk_round_trip():
+    assert_round_trip(UniformChunk(config.EMPTY), region_storage.ENCODING_PALETTE)
+
+
+def test_region_store_save_and_reload(tmp_path):
+    rng = np.random.default_rng(0)
+    chunks = {
+        (0, 0): rng.integers(0, 4, (SIZE, SIZE)).astype(config.CHUNK_DTYPE),
+        (-1, 5): np.full((SIZE, SIZE), config.EMPTY, dtype=config.CHUNK_DTYPE),
+        (region_storage.REGION_SIZE, -3): rng.integers(0, 50, (SIZE, SIZE)).astype(config.CHUNK_DTYPE),
+    }
+    store = RegionStore(str(tmp_path))
+    store.save_chunks(chunks)
+    # A noisier chunk no longer fits its slot and moves to the end of the file
+    chunks[(0, 0)] = rng.integers(0, 200, (SIZE, SIZE)).astype(config.CHUNK_DTYPE)
+    store.save_chunk(0, 0, chunks[(0, 0)])
+    store.close()
+
+    store = RegionStore(str(tmp_path))
+    assert sorted(store.stored_chunks()) == sorted(chunks)
+    for (chunk_x, chunk_y), chunk in chunks.items():
+        assert store.has_chunk(chunk_x, chunk_y)
+        np.testing.assert_array_equal(store.load_chunk(chunk_x, chunk_y), chunk)
+    assert store.load_chunk(1, 1) is None
+    assert not store.has_chunk(100, 100)
+    store.close()
@@ -0,0 +1,45 @@
+from utils.render_cache import RenderCache
+
+
+def test_evicts_least_recently_used():
+    cache = RenderCache(budget_bytes=30)
+    cache.put("a", "surface a", nbytes=10)
+    cache.put("b", "surface b", nbytes=10)
+    cache.put("c", "surface c", nbytes=10)
+    assert cache.get("a") == "surface a"  # Now most recently used
+
+    cache.put("d", "surface d", nbytes=10)
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache and "d" in cache
+    assert cache.used_bytes == 30
+    assert cache.evictions == 1
+
+
+def test_replace_and_invalidate_keep_byte_count():
+    cache = RenderCache(budget_bytes=100)
+    cache.put("a", "old", nbytes=40)
+    cache.put("a", "new", nbytes=20)
+    cache.put("shared", "new", nbytes=0)
+    assert cache.used_bytes == 20
+    assert cache.peek("a") == "new"
+
+    assert cache.invalidate_many(["a", "missing"]) == 1
+    assert cache.used_bytes == 0
+    assert len(cache) == 1
+
+
+def test_oversized_entry_is_kept():
+    cache = RenderCache(budget_bytes=10)
+    cache.put("small", "s", nbytes=5)
+    cache.put("big", "b", nbytes=50)
+    assert "big" in cache and "small" not in cache
+
+
+def test_stats():
+    cache = RenderCache(budget_bytes=10)
+    cache.put("a", "s", nbytes=1)
+    cache.get("a")
+    cache.get("missing")
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
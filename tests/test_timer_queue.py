@@ -0,0 +1,31 @@
+from systems.timer_queue import TimerQueue
+
+
+def test_runs_due_timers_in_order():
+    timers = TimerQueue()
+    calls = []
+    timers.schedule(2.0, calls.append, "late")
+    timers.schedule(1.0, calls.append, "first")
+    timers.schedule(1.0, calls.append, "second")
+    assert len(timers) == 3
+    assert timers.next_deadline() == 1.0
+
+    assert timers.run_due(1.5) == 2
+    assert calls == ["first", "second"]
+    assert timers.run_due(3.0) == 1
+    assert calls == ["first", "second", "late"]
+    assert len(timers) == 0
+    assert timers.next_deadline() is None
+
+
+def test_cancel():
+    timers = TimerQueue()
+    calls = []
+    timer = timers.schedule(1.0, calls.append, "cancelled")
+    timers.schedule(2.0, calls.append, "kept")
+    timers.cancel(timer)
+    timers.cancel(timer)
+    assert len(timers) == 1
+    assert timers.next_deadline() == 2.0
+    assert timers.run_due(5.0) == 1
+    assert calls == ["kept"]
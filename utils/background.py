@@ -2,6 +2,7 @@ import pygame
 import math
 import numpy as np
 from core import config
+from utils.surface_format import convert_layer, convert_surface, on_display_change
 
 # Constants for background rendering
 SKY_COLOR_DAY = (135, 206, 235)    # Light blue for day
@@ -116,36 +117,92 @@ def blend_colors(color1, color2, factor):
     b = int(color1[2] + (color2[2] - color1[2]) * factor)
     return (r, g, b)
 
-def draw_background(screen, camera_x, camera_y, time_of_day, width, height, cloud_layer, hill_layers, star_layer):
-    """Draw the entire background with parallax effect."""
-    # Fill the sky
-    sky_color = get_sky_color(time_of_day)
-    screen.fill(sky_color)
-    
-    # Draw stars if it's night
-    if time_of_day > 0.75 or time_of_day < 0.25:
-        star_alpha = 255
-        if 0.2 < time_of_day < 0.3:  # Fade out at sunrise
-            star_alpha = int(255 * (0.3 - time_of_day) / 0.1)
-        elif 0.7 < time_of_day < 0.8:  # Fade in at sunset
-            star_alpha = int(255 * (time_of_day - 0.7) / 0.1)
+SKY_STEPS = 96  # Sky and star fade are recomputed this many times per day
+
+class BackgroundRenderer:
+    """Parallax background with layers prepared once instead of every frame.
+
+    The layers are converted to the display format (with a colorkey instead
+    of per-pixel alpha when they have no soft edges, again after every
+    display mode change), and the sky color with
+    the star layer blended over it is cached as one opaque surface, rebuilt
+    only when time_of_day crosses one of SKY_STEPS steps. Parts of the screen
+    hidden by opaque terrain (below opaque_top) are not drawn at all.
+    """
+
+    def __init__(self, width, height, cloud_layer, hill_layers, star_layer):
+        self.width = width
+        self.height = height
+        self.cloud_layer = cloud_layer
+        self.hill_layers = hill_layers
+        self.star_layer = star_layer
+        self.convert_layers()
+        on_display_change(self.convert_layers)
         
-        star_layer.set_alpha(star_alpha)
-        star_offset_x = int(camera_x * 0.01) % width
-        screen.blit(star_layer, (-star_offset_x, 0))
-        if star_offset_x > 0:
-            screen.blit(star_layer, (width - star_offset_x, 0))
+        # First row holding visible pixels, to skip layers hidden by terrain
+        self.cloud_top = self.cloud_layer.get_bounding_rect().top
+        self.hill_tops = [hill_layer.get_bounding_rect().top for hill_layer in self.hill_layers]
+    
+    def convert_layers(self):
+        """Convert the layers to the current display format."""
+        self.cloud_layer = convert_layer(self.cloud_layer)
+        self.hill_layers = [convert_layer(hill_layer) for hill_layer in self.hill_layers]
+        self.star_layer = convert_layer(self.star_layer)
+        self.sky_key = None  # (sky color, star alpha) of sky_layer
+        self.sky_layer = None
+    
+    def get_sky(self, time_of_day):
+        """Sky color and star alpha for a time of day, quantized to SKY_STEPS."""
+        time_of_day = round(time_of_day * SKY_STEPS) % SKY_STEPS / SKY_STEPS
+        sky_color = get_sky_color(time_of_day)
+        star_alpha = 0
+        if time_of_day > 0.75 or time_of_day < 0.25:
+            star_alpha = 255
+            if 0.2 < time_of_day < 0.3:  # Fade out at sunrise
+                star_alpha = int(255 * (0.3 - time_of_day) / 0.1)
+            elif 0.7 < time_of_day < 0.8:  # Fade in at sunset
+                star_alpha = int(255 * (time_of_day - 0.7) / 0.1)
+        return sky_color, star_alpha
     
-    # Draw distant hills with parallax
-    for i, hill_layer in enumerate(hill_layers):
-        parallax_factor = 0.1 * (i + 1)
-        offset_x = int(camera_x * parallax_factor) % width
-        screen.blit(hill_layer, (-offset_x, 0))
-        if offset_x > 0:
-            screen.blit(hill_layer, (width - offset_x, 0))
+    def _blit_wrapped(self, screen, layer, offset_x, visible_width):
+        screen.blit(layer, (-offset_x, 0))
+        if offset_x > self.width - visible_width:
+            screen.blit(layer, (self.width - offset_x, 0))
     
-    # Draw clouds with parallax
-    cloud_offset_x = int(camera_x * 0.2) % width
-    screen.blit(cloud_layer, (-cloud_offset_x, 0))
-    if cloud_offset_x > 0:
-        screen.blit(cloud_layer, (width - cloud_offset_x, 0))
+    def draw(self, screen, camera_x, camera_y, time_of_day, opaque_top=None):
+        """Draw the background; rows from opaque_top down are left to the terrain."""
+        visible_height = screen.get_height() if opaque_top is None else min(opaque_top, screen.get_height())
+        if visible_height <= 0:
+            return  # Entirely hidden by terrain
+        visible_width = screen.get_width()
+        old_clip = screen.get_clip()
+        screen.set_clip(pygame.Rect(0, 0, visible_width, visible_height).clip(old_clip))
+        
+        sky_color, star_alpha = self.get_sky(time_of_day)
+        if star_alpha == 0:
+            screen.fill(sky_color)
+        else:
+            # Stars blended over the sky once per step, then drawn as an opaque layer
+            if self.sky_key != (sky_color, star_alpha):
+                sky_layer = convert_surface(pygame.Surface((self.width, self.height)), alpha=False)
+                sky_layer.fill(sky_color)
+                self.star_layer.set_alpha(star_alpha)
+                sky_layer.blit(self.star_layer, (0, 0))
+                self.sky_layer = sky_layer
+                self.sky_key = (sky_color, star_alpha)
+            if visible_height > self.height or visible_width > self.width:
+                screen.fill(sky_color)  # Window resized past the layer: no stars there, but no stale pixels
+            self._blit_wrapped(screen, self.sky_layer, int(camera_x * 0.01) % self.width, visible_width)
+        
+        # Draw distant hills with parallax
+        for i, hill_layer in enumerate(self.hill_layers):
+            if self.hill_tops[i] >= visible_height:
+                continue
+            parallax_factor = 0.1 * (i + 1)
+            self._blit_wrapped(screen, hill_layer, int(camera_x * parallax_factor) % self.width, visible_width)
+        
+        # Draw clouds with parallax
+        if self.cloud_top < visible_height:
+            self._blit_wrapped(screen, self.cloud_layer, int(camera_x * 0.2) % self.width, visible_width)
+        
+        screen.set_clip(old_clip)
@@ -0,0 +1,92 @@
+from collections import OrderedDict
+
+def surface_bytes(surface):
+    """Approximate memory used by a pygame surface's pixels."""
+    return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+class RenderCache:
+    """LRU cache of rendered surfaces with a byte budget.
+
+    Least recently used entries are evicted once the total size goes over
+    budget_bytes. Hits, misses and evictions are counted so the cache can be
+    tuned from the performance overlay.
+    """
+
+    def __init__(self, budget_bytes, name="render"):
+        self.name = name
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # {key: (surface, nbytes)}, least recently used first
+
+    def get(self, key, default=None):
+        """Return a cached surface and mark it as recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def peek(self, key, default=None):
+        """Return a cached surface without touching the LRU order or counters."""
+        entry = self._entries.get(key)
+        return default if entry is None else entry[0]
+
+    def put(self, key, surface, nbytes=None):
+        """Cache a surface, evicting old entries if the budget is exceeded.
+
+        nbytes defaults to the surface's pixel size; pass 0 for surfaces
+        shared with other entries so they are only counted once.
+        """
+        if nbytes is None:
+            nbytes = surface_bytes(surface)
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.used_bytes -= old[1]
+        self._entries[key] = (surface, nbytes)
+        self.used_bytes += nbytes
+
+        # Never evict the entry just added, even if it alone is over budget
+        while self.used_bytes > self.budget_bytes and len(self._entries) > 1:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.used_bytes -= evicted_bytes
+            self.evictions += 1
+
+    def invalidate(self, key):
+        """Drop one entry. Returns True if it was cached."""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.used_bytes -= entry[1]
+        return True
+
+    def invalidate_many(self, keys):
+        """Drop several entries. Returns how many were cached."""
+        return sum(self.invalidate(key) for key in keys)
+
+    def clear(self):
+        self._entries.clear()
+        self.used_bytes = 0
+
+    def stats(self):
+        """Counters for the performance overlay."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "used_bytes": self.used_bytes,
+            "budget_bytes": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,6 +1,11 @@
 import pygame
+import numpy as np
 from core import config
 from world import chunks  # Import chunks to access the cache and modified chunks
+from world.uniform_chunk import UniformChunk
+from utils.render_cache import RenderCache, surface_bytes
+from utils.surface_format import (convert_surface, new_layer, clear_layer, pick_colorkey,
+                                  supports_colorkey_layers, on_display_change)
 import json
 import os
 
@@ -39,7 +44,7 @@ def create_block_surfaces():
             # Fallback to color if no texture is provided
             surface.fill(tuple(block_data["color"]))
         
-        block_surfaces[block_id] = surface
+        block_surfaces[block_id] = convert_surface(surface)
     return block_surfaces
 
 def render_block(surface, block_type, x, y, block_surfaces):
@@ -47,50 +52,407 @@ def render_block(surface, block_type, x, y, block_surfaces):
     block_surface = block_surfaces[block_type]
     surface.blit(block_surface, (x, y))
 
+_tile_lut = None  # (block_count, PIXEL_SIZE, PIXEL_SIZE, 4) RGBA pixels per block ID, indexed [x, y]
+_tile_lut_source = None  # block_surfaces dict the table was built from
+_chunk_colorkey = None  # Transparent color of chunk surfaces, None when they need per-pixel alpha
+
+def get_tile_lut(block_surfaces):
+    """Lookup table of every block's pixels, built once from block_surfaces.
+
+    EMPTY and the ore processor are fully transparent: the ore processor
+    texture is drawn separately over its whole multi-block footprint.
+    """
+    global _tile_lut, _tile_lut_source, _chunk_colorkey
+    if _tile_lut is None or _tile_lut_source is not block_surfaces:
+        lut = np.zeros((max(block_surfaces) + 1, config.PIXEL_SIZE, config.PIXEL_SIZE, 4), dtype=np.uint8)
+        for block_id, block_surface in block_surfaces.items():
+            if block_id in (config.EMPTY, config.ORE_PROCESSOR):
+                continue
+            lut[block_id, :, :, :3] = pygame.surfarray.array3d(block_surface)
+            lut[block_id, :, :, 3] = pygame.surfarray.array_alpha(block_surface)
+        _tile_lut = lut
+        _tile_lut_source = block_surfaces
+        
+        # Tiles that are either opaque or fully transparent can be drawn on colorkey surfaces
+        alpha = lut[:, :, :, 3]
+        _chunk_colorkey = None
+        if supports_colorkey_layers() and ((alpha == 0) | (alpha == 255)).all():
+            _chunk_colorkey = pick_colorkey(lut[:, :, :, :3][alpha == 255])
+            if _chunk_colorkey is not None:
+                lut[:, :, :, :3][alpha == 0] = _chunk_colorkey
+    return _tile_lut
+
+def get_chunk_colorkey(block_surfaces):
+    """Colorkey used by chunk surfaces and super-chunk tiles, or None for per-pixel alpha."""
+    get_tile_lut(block_surfaces)
+    return _chunk_colorkey
+
+def rasterize_chunk(chunk, block_surfaces, surface=None, cells=None):
+    """Draw a chunk onto a surface with one lookup through the tile table.
+
+    cells is an optional (min_x, min_y, max_x, max_y) rectangle, inclusive,
+    limiting the redraw to those cells of an already rendered surface.
+    """
+    lut = get_tile_lut(block_surfaces)
+    size = config.CHUNK_SIZE * config.PIXEL_SIZE
+    if surface is None:
+        surface = new_layer((size, size), get_chunk_colorkey(block_surfaces))
+        cells = None
+    if cells is None:
+        cells = (0, 0, config.CHUNK_SIZE - 1, config.CHUNK_SIZE - 1)
+    min_x, min_y, max_x, max_y = cells
+    
+    # Surfaces are indexed [x, y]: transpose the chunk, then lay the tiles out
+    block_ids = np.asarray(chunk)[min_y:max_y + 1, min_x:max_x + 1].T
+    block_ids = np.minimum(block_ids, len(lut) - 1)
+    width, height = block_ids.shape
+    pixels = lut[block_ids].transpose(0, 2, 1, 3, 4).reshape(
+        width * config.PIXEL_SIZE, height * config.PIXEL_SIZE, 4)
+    
+    left, top = min_x * config.PIXEL_SIZE, min_y * config.PIXEL_SIZE
+    right, bottom = (max_x + 1) * config.PIXEL_SIZE, (max_y + 1) * config.PIXEL_SIZE
+    rgb = pygame.surfarray.pixels3d(surface)
+    rgb[left:right, top:bottom] = pixels[:, :, :3]  # Transparent tiles hold the colorkey
+    del rgb  # Release the surface lock
+    if surface.get_colorkey() is None:
+        alpha = pygame.surfarray.pixels_alpha(surface)
+        alpha[left:right, top:bottom] = pixels[:, :, 3]
+        del alpha
+    return surface
+
+multi_block_sprites = {}  # {(block_type, width, height): scaled surface}
+
+def get_multi_block_sprite(block_type, width, height):
+    """Texture covering a whole multi-block, loaded and scaled once per type and size."""
+    key = (block_type, width, height)
+    sprite = multi_block_sprites.get(key)
+    if sprite is None:
+        size = (width * config.PIXEL_SIZE, height * config.PIXEL_SIZE)
+        block_data = config.BLOCKS[block_type]
+        try:
+            texture = pygame.image.load(block_data["texture"]).convert_alpha()
+            sprite = pygame.transform.scale(texture, size)
+        except (KeyError, pygame.error, FileNotFoundError) as e:
+            print(f"Error loading texture for block {block_data['name']}: {e}")
+            sprite = convert_surface(pygame.Surface(size, pygame.SRCALPHA))
+            sprite.fill(tuple(block_data["color"]))  # Fallback to color
+        multi_block_sprites[key] = sprite
+    return sprite
+
+uniform_chunk_surfaces = {}  # {block_type: surface} shared by every uniform chunk of that block
+
+def get_uniform_chunk_surface(chunk, block_surfaces):
+    """Surface for a chunk made of a single block type, rendered once per type."""
+    surface = uniform_chunk_surfaces.get(chunk.value)
+    if surface is None:
+        surface = rasterize_chunk(chunk, block_surfaces)
+        uniform_chunk_surfaces[chunk.value] = surface
+    return surface
+
 def render_chunk(chunk, chunk_x, chunk_y, camera_x, camera_y, 
                 mining_animation, block_surfaces, machine_system, multi_block_system=None):
     """Renders a chunk to a surface."""
-    # Check if the chunk is in cache and not modified
+    # Check if the chunk is in cache and was rendered at its current generation
     cache_key = (chunk_x, chunk_y)
-    if cache_key in chunks.chunk_cache and cache_key not in chunks.modified_chunks:
-        return chunks.chunk_cache[cache_key]
-    
-    # Create a new surface for rendering
-    surface = pygame.Surface((config.CHUNK_SIZE * config.PIXEL_SIZE, config.CHUNK_SIZE * config.PIXEL_SIZE), pygame.SRCALPHA)
-    surface.fill((0, 0, 0, 0))  # Fully transparent background
-    
-    for y in range(config.CHUNK_SIZE):
-        for x in range(config.CHUNK_SIZE):
-            block_type = chunk[y, x]
-            if block_type == config.ORE_PROCESSOR:
-                # Vérifiez si c'est l'origine de l'ore_processor
-                origin_x, origin_y = chunk_x * config.CHUNK_SIZE + x, chunk_y * config.CHUNK_SIZE + y
-                machine_origin = machine_system.get_machine_origin(origin_x, origin_y)
-                if machine_origin == (origin_x, origin_y):  # Vérifiez si c'est l'origine
-                    width, height = config.BLOCKS[block_type].get("size", (1, 1))
-                    
-                    # Chargez et redimensionnez la texture pour couvrir tout le multi-bloc
-                    texture = pygame.image.load(config.BLOCKS[block_type]["texture"]).convert_alpha()
-                    texture = pygame.transform.scale(texture, (width * config.PIXEL_SIZE, height * config.PIXEL_SIZE))
-                    
-                    # Blit la texture redimensionnée sur la surface principale
-                    screen_x = (origin_x - chunk_x * config.CHUNK_SIZE) * config.PIXEL_SIZE
-                    screen_y = (origin_y - chunk_y * config.CHUNK_SIZE) * config.PIXEL_SIZE
-                    surface.blit(texture, (screen_x, screen_y))
-            elif block_type != config.EMPTY:
-                block_x = x * config.PIXEL_SIZE
-                block_y = y * config.PIXEL_SIZE
-                render_block(surface, block_type, block_x, block_y, block_surfaces)
-    
-    # Cache the rendered chunk
-    chunks.chunk_cache[cache_key] = surface
-    
-    # Mark as no longer modified
-    if cache_key in chunks.modified_chunks:
-        chunks.modified_chunks.remove(cache_key)
+    version = chunks.chunk_versions.get(cache_key)
+    if chunks.rendered_versions.get(cache_key) == version:
+        surface = chunks.chunk_cache.get(cache_key)
+        if surface is not None:
+            return surface
+    
+    # Sky and deep chunks share one pre-rendered surface per block type
+    if isinstance(chunk, UniformChunk) and chunk.value != config.ORE_PROCESSOR:
+        surface = get_uniform_chunk_surface(chunk, block_surfaces)
+        chunks.chunk_cache.put(cache_key, surface, nbytes=0)  # Shared, not counted per chunk
+        chunks.rendered_versions[cache_key] = version
+        chunks.dirty_cells.pop(cache_key, None)
+        return surface
+    
+    # Redraw into the cached surface unless it is shared with uniform chunks
+    surface = chunks.chunk_cache.peek(cache_key)
+    if any(surface is shared for shared in uniform_chunk_surfaces.values()):
+        surface = None
+    
+    # Only the changed cells, unless a multi-block texture may overlap them
+    cells = chunks.dirty_cells.pop(cache_key, None)
+    ore_processor_cells = np.argwhere(np.asarray(chunk) == config.ORE_PROCESSOR)
+    if len(ore_processor_cells):
+        cells = None
+    surface = rasterize_chunk(chunk, block_surfaces, surface, cells)
+    
+    # Ore processors span several blocks: draw the texture once at each origin
+    for y, x in ore_processor_cells.tolist():
+        block_type = config.ORE_PROCESSOR
+        # Vérifiez si c'est l'origine de l'ore_processor
+        origin_x, origin_y = chunk_x * config.CHUNK_SIZE + x, chunk_y * config.CHUNK_SIZE + y
+        if machine_system.is_machine_origin(origin_x, origin_y):
+            width, height = config.BLOCKS[block_type].get("size", (1, 1))
+            
+            # Texture pré-chargée et redimensionnée pour couvrir tout le multi-bloc
+            texture = get_multi_block_sprite(block_type, width, height)
+            
+            # Blit la texture redimensionnée sur la surface principale
+            screen_x = x * config.PIXEL_SIZE
+            screen_y = y * config.PIXEL_SIZE
+            surface.blit(texture, (screen_x, screen_y))
+    
+    # Cache the rendered chunk; saving tracks its own generation and is not affected
+    chunks.chunk_cache.put(cache_key, surface)
+    chunks.rendered_versions[cache_key] = version
     
     return surface
 
+SUPER_CHUNK_SIZE = 8  # Chunks per side of a super-chunk render tile
+# {(tile_x, tile_y): (surface, {chunk: generation drawn})} compositing SUPER_CHUNK_SIZE x SUPER_CHUNK_SIZE chunks
+super_chunk_tiles = RenderCache(config.SUPER_CHUNK_CACHE_BUDGET, "super-chunk tiles")
+
+def get_super_chunk_coords(chunk_x, chunk_y):
+    """Get the super-chunk tile containing a chunk."""
+    return chunk_x // SUPER_CHUNK_SIZE, chunk_y // SUPER_CHUNK_SIZE
+
+def _draw_chunk_into_tile(tile, chunk_x, chunk_y, chunk_surface):
+    """Replace one chunk's cell of a tile (cleared when chunk_surface is None)."""
+    chunk_pixels = config.CHUNK_SIZE * config.PIXEL_SIZE
+    rect = pygame.Rect((chunk_x % SUPER_CHUNK_SIZE) * chunk_pixels,
+                       (chunk_y % SUPER_CHUNK_SIZE) * chunk_pixels,
+                       chunk_pixels, chunk_pixels)
+    clear_layer(tile, rect)
+    if chunk_surface is not None:
+        tile.blit(chunk_surface, rect)
+
+def _get_tile_chunks(tile_x, tile_y):
+    """Coordinates of the chunks covered by a super-chunk tile."""
+    return [(chunk_x, chunk_y)
+            for chunk_y in range(tile_y * SUPER_CHUNK_SIZE, (tile_y + 1) * SUPER_CHUNK_SIZE)
+            for chunk_x in range(tile_x * SUPER_CHUNK_SIZE, (tile_x + 1) * SUPER_CHUNK_SIZE)]
+
+def _build_super_chunk(tile_x, tile_y, loaded_chunks, mining_animation, block_surfaces, machine_system):
+    """Composite every loaded chunk of a tile into a new surface.
+
+    Returns the surface and the generation of each chunk drawn into it.
+    """
+    tile_pixels = SUPER_CHUNK_SIZE * config.CHUNK_SIZE * config.PIXEL_SIZE
+    tile = new_layer((tile_pixels, tile_pixels), get_chunk_colorkey(block_surfaces))
+    clear_layer(tile)
+    versions = {}
+    for chunk_x, chunk_y in _get_tile_chunks(tile_x, tile_y):
+        chunk = loaded_chunks.get((chunk_x, chunk_y))
+        if chunk is not None:
+            chunk_surface = render_chunk(chunk, chunk_x, chunk_y, 0, 0, mining_animation,
+                                         block_surfaces, machine_system)
+            _draw_chunk_into_tile(tile, chunk_x, chunk_y, chunk_surface)
+            versions[(chunk_x, chunk_y)] = chunks.chunk_versions.get((chunk_x, chunk_y))
+    return tile, versions
+
+def render_super_chunks(screen, camera_x, camera_y, active_chunks, loaded_chunks,
+                        mining_animation, block_surfaces, machine_system):
+    """Draw the visible chunks as super-chunk tiles, one blit per tile.
+
+    Tiles are kept between frames along with the generation of each chunk
+    drawn into them. A chunk whose generation changed (it was edited,
+    loaded or unloaded) is redrawn into its tile when the tile is shown;
+    the other chunks of the tile are left alone.
+    """
+    visible_tiles = {get_super_chunk_coords(chunk_x, chunk_y) for chunk_x, chunk_y in active_chunks}
+    
+    tile_pixels = SUPER_CHUNK_SIZE * config.CHUNK_SIZE * config.PIXEL_SIZE
+    for tile_x, tile_y in visible_tiles:
+        cached = super_chunk_tiles.get((tile_x, tile_y))
+        if cached is None:
+            cached = _build_super_chunk(tile_x, tile_y, loaded_chunks, mining_animation,
+                                        block_surfaces, machine_system)
+            super_chunk_tiles.put((tile_x, tile_y), cached, surface_bytes(cached[0]))
+        else:
+            # Redraw the chunks that changed since the tile was drawn
+            tile, versions = cached
+            for coords in _get_tile_chunks(tile_x, tile_y):
+                version = chunks.chunk_versions.get(coords)
+                if versions.get(coords) == version:
+                    continue
+                chunk = loaded_chunks.get(coords)
+                chunk_surface = None
+                if chunk is not None:
+                    chunk_surface = render_chunk(chunk, coords[0], coords[1], camera_x, camera_y,
+                                                 mining_animation, block_surfaces, machine_system)
+                _draw_chunk_into_tile(tile, coords[0], coords[1], chunk_surface)
+                if chunk_surface is None:
+                    versions.pop(coords, None)
+                else:
+                    versions[coords] = version
+        screen.blit(cached[0], (tile_x * tile_pixels - camera_x, tile_y * tile_pixels - camera_y))
+
+opaque_block_lut = None  # (block_count,) bool, True for blocks whose tile has no transparent pixel
+chunk_opacity = {}  # {(chunk_x, chunk_y): (generation, fully opaque)}
+
+def is_chunk_opaque(chunk_x, chunk_y, loaded_chunks, block_surfaces):
+    """Check whether a loaded chunk hides everything drawn behind it."""
+    global opaque_block_lut
+    coords = (chunk_x, chunk_y)
+    chunk = loaded_chunks.get(coords)
+    if chunk is None:
+        return False
+    version = chunks.chunk_versions.get(coords)
+    cached = chunk_opacity.get(coords)
+    if cached is not None and version is not None and cached[0] == version:
+        return cached[1]
+    
+    if opaque_block_lut is None or _tile_lut_source is not block_surfaces:
+        # Ore processors are transparent in the tile table and drawn as a sprite: never opaque
+        opaque_block_lut = get_tile_lut(block_surfaces)[:, :, :, 3].min(axis=(1, 2)) == 255
+    if isinstance(chunk, UniformChunk):
+        opaque = chunk.value < len(opaque_block_lut) and bool(opaque_block_lut[chunk.value])
+    else:
+        opaque = bool(opaque_block_lut[np.minimum(chunk, len(opaque_block_lut) - 1)].all())
+    
+    if len(chunk_opacity) > 2 * len(loaded_chunks) + 256:
+        # Forget unloaded chunks
+        for stale in [key for key in chunk_opacity if key not in loaded_chunks]:
+            del chunk_opacity[stale]
+    chunk_opacity[coords] = (version, opaque)
+    return opaque
+
+def get_opaque_screen_top(camera_x, camera_y, screen_width, screen_height, loaded_chunks, block_surfaces):
+    """Screen row from which down the terrain is fully opaque (screen_height if none).
+
+    Scans rows of chunks up from the bottom of the screen, stopping at the
+    first row with a chunk that is missing or not fully opaque.
+    """
+    chunk_pixels = config.CHUNK_SIZE * config.PIXEL_SIZE
+    first_chunk_x = int(camera_x // chunk_pixels)
+    last_chunk_x = int((camera_x + screen_width - 1) // chunk_pixels)
+    chunk_y = int((camera_y + screen_height - 1) // chunk_pixels)
+    top = screen_height
+    while top > 0:
+        for chunk_x in range(first_chunk_x, last_chunk_x + 1):
+            if not is_chunk_opaque(chunk_x, chunk_y, loaded_chunks, block_surfaces):
+                return top
+        top = int(chunk_y * chunk_pixels - camera_y)
+        chunk_y -= 1
+    return max(top, 0)
+
+MAX_LOD_LEVEL = 5  # At level 5 a 16x16 chunk (32 pixels) shrinks to a single pixel
+lod_color_lut = None  # (block_count, 4) RGBA color per block ID for downsampled rendering
+# {(level, tile_x, tile_y): (surface, {member chunk: generation drawn})}
+lod_tiles = RenderCache(config.LOD_CACHE_BUDGET, "LOD tiles")
+
+def get_lod_level(view_multiplier):
+    """LOD level for a view distance: each level halves the world's on-screen size."""
+    level = 0
+    while level < MAX_LOD_LEVEL and 2 ** (level + 1) <= view_multiplier:
+        level += 1
+    return level
+
+def get_lod_color_lut(block_surfaces):
+    """One color per block ID: the average of its tile pixels."""
+    global lod_color_lut
+    if lod_color_lut is None or _tile_lut_source is not block_surfaces:
+        tiles = get_tile_lut(block_surfaces)
+        lut = np.zeros((len(tiles), 4), dtype=np.uint8)
+        # Average of the visible pixels (transparent ones hold the colorkey)
+        visible = tiles[:, :, :, 3] > 0
+        counts = np.maximum(visible.sum(axis=(1, 2)), 1)[:, np.newaxis]
+        lut[:, :3] = (tiles[:, :, :, :3] * visible[..., np.newaxis]).sum(axis=(1, 2)) // counts
+        lut[:, 3] = tiles[:, :, :, 3].max(axis=(1, 2))
+        # The ore processor is transparent in the tile table; use its block color
+        if config.ORE_PROCESSOR < len(lut):
+            lut[config.ORE_PROCESSOR, :3] = config.BLOCKS[config.ORE_PROCESSOR]["color"]
+            lut[config.ORE_PROCESSOR, 3] = 255
+        lod_color_lut = lut
+    return lod_color_lut
+
+def majority_pool(block_ids, factor):
+    """Downsample a 2D ID array by `factor`, keeping the most common ID of each square."""
+    if factor == 1:
+        return block_ids
+    rows, cols = block_ids.shape[0] // factor, block_ids.shape[1] // factor
+    cells = block_ids.reshape(rows, factor, cols, factor).transpose(0, 2, 1, 3).reshape(rows, cols, -1)
+    ids = np.unique(cells)
+    if len(ids) == 1:
+        return np.full((rows, cols), ids[0], dtype=block_ids.dtype)
+    counts = (cells[..., np.newaxis] == ids).sum(axis=2)
+    return ids[counts.argmax(axis=2)]
+
+def _build_lod_tile(level, tile_x, tile_y, members, loaded_chunks, block_surfaces):
+    """Rasterize a super-chunk tile at an LOD level from the chunks' ID arrays."""
+    blocks = SUPER_CHUNK_SIZE * config.CHUNK_SIZE
+    pixels = (blocks * config.PIXEL_SIZE) >> level
+    block_ids = np.full((blocks, blocks), config.EMPTY, dtype=config.CHUNK_DTYPE)
+    for chunk_x, chunk_y in members:
+        left = (chunk_x - tile_x * SUPER_CHUNK_SIZE) * config.CHUNK_SIZE
+        top = (chunk_y - tile_y * SUPER_CHUNK_SIZE) * config.CHUNK_SIZE
+        block_ids[top:top + config.CHUNK_SIZE, left:left + config.CHUNK_SIZE] = loaded_chunks[(chunk_x, chunk_y)]
+    
+    lut = get_lod_color_lut(block_surfaces)
+    if pixels >= blocks:
+        # Still at least one pixel per block: no pooling needed
+        colors = lut[np.minimum(block_ids, len(lut) - 1)]
+        colors = colors.repeat(pixels // blocks, axis=0).repeat(pixels // blocks, axis=1)
+    else:
+        colors = lut[np.minimum(majority_pool(block_ids, blocks // pixels), len(lut) - 1)]
+    
+    surface = new_layer((pixels, pixels))
+    colors = colors.transpose(1, 0, 2)  # Surfaces are indexed [x, y]
+    rgb = pygame.surfarray.pixels3d(surface)
+    rgb[...] = colors[:, :, :3]
+    del rgb  # Release the surface lock
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    alpha[...] = colors[:, :, 3]
+    del alpha
+    return surface
+
+def render_lod_chunks(screen, camera_x, camera_y, active_chunks, loaded_chunks, block_surfaces, level):
+    """Draw the visible chunks zoomed out by 2**level around the screen center.
+
+    Chunks are downsampled by majority pooling of their block IDs and
+    composited into super-chunk tiles, cached per level. A tile is rebuilt
+    when the generation of one of its chunks changes (edited, loaded or
+    unloaded).
+    """
+    tile_members = {}
+    chunk_versions = chunks.chunk_versions
+    for coords in active_chunks:
+        tile_members.setdefault(get_super_chunk_coords(*coords), {})[coords] = chunk_versions.get(coords)
+    
+    scale = 2 ** level
+    tile_world_pixels = SUPER_CHUNK_SIZE * config.CHUNK_SIZE * config.PIXEL_SIZE
+    half_width, half_height = screen.get_width() / 2, screen.get_height() / 2
+    for (tile_x, tile_y), members in tile_members.items():
+        cached = lod_tiles.get((level, tile_x, tile_y))
+        if cached is None or cached[1] != members:
+            cached = (_build_lod_tile(level, tile_x, tile_y, members, loaded_chunks, block_surfaces), members)
+            lod_tiles.put((level, tile_x, tile_y), cached, surface_bytes(cached[0]))
+        screen_x = (tile_x * tile_world_pixels - camera_x - half_width) / scale + half_width
+        screen_y = (tile_y * tile_world_pixels - camera_y - half_height) / scale + half_height
+        screen.blit(cached[0], (round(screen_x), round(screen_y)))
+
+def screen_to_world(screen_x, screen_y, camera_x, camera_y, screen_width, screen_height, level=0):
+    """World pixel under a screen point, undoing the zoom of render_lod_chunks around the screen center."""
+    scale = 2 ** level
+    half_width, half_height = screen_width / 2, screen_height / 2
+    return ((screen_x - half_width) * scale + half_width + camera_x,
+            (screen_y - half_height) * scale + half_height + camera_y)
+
+def world_to_screen(world_x, world_y, camera_x, camera_y, screen_width, screen_height, level=0):
+    """Screen point where a world pixel is drawn at a LOD level (inverse of screen_to_world)."""
+    scale = 2 ** level
+    half_width, half_height = screen_width / 2, screen_height / 2
+    return ((world_x - camera_x - half_width) / scale + half_width,
+            (world_y - camera_y - half_height) / scale + half_height)
+
+def reset_render_caches():
+    """Drop every cached chunk, tile and sprite surface so they are rebuilt in the new display format."""
+    global _tile_lut
+    _tile_lut = None  # Recheck whether colorkey surfaces are usable
+    chunks.chunk_cache.clear()
+    chunks.rendered_versions.clear()
+    chunks.dirty_cells.clear()
+    super_chunk_tiles.clear()
+    lod_tiles.clear()
+    uniform_chunk_surfaces.clear()
+    multi_block_sprites.clear()
+
+on_display_change(reset_render_caches)
+
 def draw_performance_stats(screen, dt, active_chunk_count, cache_size, fps_font):
     """Draw performance statistics on screen."""
     fps = int(1.0 / dt) if dt > 0 else 0
@@ -99,14 +461,19 @@ def draw_performance_stats(screen, dt, active_chunk_count, cache_size, fps_font)
     fps_text = f"FPS: {fps}"
     chunks_text = f"Chunks: {active_chunk_count}"
     memory_text = f"Cache: {cache_size} chunks"
-    modified_text = f"Modified: {len(chunks.modified_chunks)} chunks"
+    modified_text = f"Unsaved: {chunks.get_unsaved_chunk_count()} chunks"
+    stats = chunks.chunk_cache.stats()
+    render_cache_text = (f"Render cache: {stats['used_bytes'] / (1024 * 1024):.1f} MB, "
+                         f"{stats['hit_rate'] * 100:.0f}% hits, {stats['evictions']} evicted")
     
     fps_surface = fps_font.render(fps_text, True, text_color)
     chunks_surface = fps_font.render(chunks_text, True, text_color)
     memory_surface = fps_font.render(memory_text, True, text_color)
     modified_surface = fps_font.render(modified_text, True, text_color)
+    render_cache_surface = fps_font.render(render_cache_text, True, text_color)
     
     screen.blit(fps_surface, (10, 10))
     screen.blit(chunks_surface, (10, 30))
     screen.blit(memory_surface, (10, 50))
     screen.blit(modified_surface, (10, 70))
+    screen.blit(render_cache_surface, (10, 90))
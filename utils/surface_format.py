@@ -0,0 +1,84 @@
+import pygame
+import numpy as np
+
+# Candidate transparent colors for colorkey surfaces; the first one not used by any opaque pixel is picked
+COLORKEY_CANDIDATES = [(255, 0, 255), (0, 255, 255), (255, 0, 254), (1, 254, 1)]
+
+_display_callbacks = []  # Functions called after the display mode changes
+
+def display_ready():
+    """Check whether a display mode is set, which convert() needs."""
+    return pygame.display.get_surface() is not None
+
+def convert_surface(surface, alpha=True):
+    """Return the surface in the display's pixel format (unchanged if there is no display yet)."""
+    if not display_ready():
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
+
+def convert_surfaces(surfaces):
+    """Convert a {key: surface} dict to the display format, in place."""
+    for key, surface in surfaces.items():
+        surfaces[key] = convert_surface(surface)
+    return surfaces
+
+def pick_colorkey(rgb):
+    """First candidate color missing from an (..., 3) array of opaque pixels, or None."""
+    rgb = np.asarray(rgb).reshape(-1, 3)
+    for color in COLORKEY_CANDIDATES:
+        if not (rgb == color).all(axis=1).any():
+            return color
+    return None
+
+def supports_colorkey_layers():
+    """Colorkey layers are written through surfarray.pixels3d, which needs 24 or 32 bit pixels."""
+    return display_ready() and pygame.display.get_surface().get_bytesize() >= 3
+
+def new_layer(size, colorkey=None):
+    """Create a display-format surface: opaque with a colorkey if one is given, per-pixel alpha otherwise."""
+    if colorkey is None:
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        return convert_surface(surface)
+    surface = convert_surface(pygame.Surface(size), alpha=False)
+    surface.set_colorkey(colorkey)
+    return surface
+
+def clear_layer(surface, rect=None):
+    """Make (part of) a layer fully transparent."""
+    colorkey = surface.get_colorkey()
+    surface.fill(colorkey if colorkey is not None else (0, 0, 0, 0), rect)
+
+def convert_layer(surface):
+    """Convert a layer to the display format, using a colorkey when it has no partial transparency.
+
+    Colorkey blits are cheaper than per-pixel alpha blending, and RLE
+    acceleration makes them cheaper still for mostly transparent layers.
+    """
+    if not display_ready():
+        return surface
+    if surface.get_flags() & pygame.SRCALPHA:
+        alpha = pygame.surfarray.array_alpha(surface)
+        if ((alpha == 0) | (alpha == 255)).all():
+            colorkey = pick_colorkey(pygame.surfarray.array3d(surface)[alpha == 255])
+            if colorkey is not None:
+                layer = pygame.Surface(surface.get_size())
+                layer.fill(colorkey)
+                layer.blit(surface, (0, 0))
+                layer = layer.convert()
+                layer.set_colorkey(colorkey, pygame.RLEACCEL)
+                return layer
+        return surface.convert_alpha()
+    return surface.convert()
+
+def on_display_change(callback):
+    """Register a function to call after the display mode changes (resize, fullscreen...)."""
+    _display_callbacks.append(callback)
+    return callback
+
+def refresh_display_format():
+    """Reconvert cached surfaces after a display mode change."""
+    for callback in _display_callbacks:
+        try:
+            callback()
+        except Exception as e:
+            print(f"Error converting surfaces to the new display format: {e}")
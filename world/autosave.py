@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+
+from core import config
+from world.chunks import snapshot_world, write_world_snapshot
+
+class AutosaveManager:
+    """Incremental world saves that do not stall the game loop.
+
+    save() only takes a snapshot on the calling thread (the chunks and system
+    state changed since the last save, without copying chunk arrays). The
+    chunk store's thread writes the chunks; fsync and the metadata file are
+    handled by the autosave writer thread.
+    Call tick() once per frame to save every `interval` seconds.
+    """
+
+    def __init__(self, filename, storage_system=None, interval=None, fsync=None):
+        self.filename = filename
+        self.storage_system = storage_system
+        self.interval = config.AUTOSAVE_INTERVAL if interval is None else interval
+        self.fsync = config.AUTOSAVE_FSYNC if fsync is None else fsync
+        self.last_save_time = time.time()
+
+        self._chunk_count = 0  # Chunks queued since the writer last picked up a snapshot
+        self._metadata = None  # Latest snapshot metadata waiting for the writer
+        self._writing = False
+        self._last_metadata = None  # Serialized metadata of the last completed save
+        self._running = True
+        self._condition = threading.Condition()
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+
+    def tick(self, now=None):
+        """Start an autosave if the interval has elapsed. Returns True if one was started."""
+        if self.interval <= 0:
+            return False
+        now = time.time() if now is None else now
+        if now - self.last_save_time < self.interval:
+            return False
+        self.save()
+        return True
+
+    def save(self):
+        """Snapshot the world and hand it to the writer thread."""
+        self.last_save_time = time.time()
+        chunks, metadata = snapshot_world(self.filename, self.storage_system)
+        with self._condition:
+            # Replaces a snapshot the writer has not picked up yet
+            self._chunk_count += len(chunks)
+            self._metadata = metadata
+            self._condition.notify_all()
+
+    def is_busy(self):
+        """Check whether a snapshot is waiting or being written."""
+        with self._condition:
+            return self._writing or self._metadata is not None
+
+    def flush(self, timeout=None):
+        """Wait for queued saves to finish. Returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._writing and self._metadata is None, timeout)
+
+    def stop(self, final_save=True, timeout=30):
+        """Optionally save one last time, wait for the writer and stop it."""
+        if final_save:
+            self.save()
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._writer.join(timeout)
+
+    def _writer_loop(self):
+        while True:
+            with self._condition:
+                while self._running and self._metadata is None:
+                    self._condition.wait()
+                if self._metadata is None:
+                    return
+                chunk_count, metadata = self._chunk_count, self._metadata
+                self._chunk_count, self._metadata = 0, None
+                self._writing = True
+
+            try:
+                serialized = json.dumps(metadata, sort_keys=True)
+                if chunk_count or serialized != self._last_metadata:
+                    start = time.time()
+                    write_world_snapshot(self.filename, metadata, self.fsync)
+                    print(f"Autosaved {chunk_count} chunks to {self.filename} "
+                          f"in {(time.time() - start) * 1000:.1f} ms")
+                self._last_metadata = serialized
+            except Exception as e:
+                # Chunks stay queued in the chunk store and are retried there
+                print(f"Error during autosave: {e}")
+
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
@@ -0,0 +1,127 @@
+import heapq
+import itertools
+import queue
+import threading
+
+class ChunkRequestScheduler:
+    """Priority queue of chunk generation requests.
+
+    Keeps at most one pending entry per chunk coordinate, ordered by squared
+    distance to the current focus (the player's chunk). Requests can be
+    cancelled, and moving the focus re-prioritizes everything pending and
+    drops requests that fell out of range. Chunks handed to a worker stay
+    "in progress" until complete() is called, so they are not requested twice.
+    """
+
+    def __init__(self):
+        self._heap = []  # [priority, sequence, coords, seed]; coords is None once removed
+        self._pending = {}  # {(chunk_x, chunk_y): heap entry}
+        self._in_progress = set()
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self.focus = None  # (chunk_x, chunk_y) used for priorities
+        self.radius = None  # Requests outside this square radius are cancelled
+
+    def _priority(self, chunk_x, chunk_y):
+        if self.focus is None:
+            return 0
+        dx = chunk_x - self.focus[0]
+        dy = chunk_y - self.focus[1]
+        return dx * dx + dy * dy
+
+    def _in_range(self, chunk_x, chunk_y):
+        if self.focus is None or self.radius is None:
+            return True
+        return (abs(chunk_x - self.focus[0]) <= self.radius and
+                abs(chunk_y - self.focus[1]) <= self.radius)
+
+    def _push(self, coords, seed):
+        entry = [self._priority(*coords), next(self._counter), coords, seed]
+        self._pending[coords] = entry
+        heapq.heappush(self._heap, entry)
+
+    def request(self, chunk_x, chunk_y, seed):
+        """Request generation of a chunk. Returns False if it is already pending."""
+        return self.request_many([(chunk_x, chunk_y)], seed) > 0
+
+    def request_many(self, coords, seed):
+        """Request several chunks under one lock. Returns the number of new requests."""
+        added = 0
+        with self._condition:
+            for chunk_x, chunk_y in coords:
+                key = (int(chunk_x), int(chunk_y))
+                if key in self._pending or key in self._in_progress or not self._in_range(*key):
+                    continue
+                self._push(key, seed)
+                added += 1
+            if added:
+                self._condition.notify(added)
+        return added
+
+    def cancel(self, chunk_x, chunk_y):
+        """Drop a pending request. Returns True if one was removed."""
+        with self._condition:
+            entry = self._pending.pop((chunk_x, chunk_y), None)
+            if entry is None:
+                return False
+            entry[2] = None  # Lazily removed from the heap
+            return True
+
+    def set_focus(self, chunk_x, chunk_y, radius=None):
+        """Move the focus, re-prioritize pending requests and cancel out-of-range ones."""
+        with self._condition:
+            if self.focus == (chunk_x, chunk_y) and self.radius == radius:
+                return
+            self.focus = (chunk_x, chunk_y)
+            self.radius = radius
+
+            # Rebuild the heap; it only ever holds the chunks around the player
+            pending = [(entry[2], entry[3]) for entry in self._pending.values()]
+            self._heap = []
+            self._pending = {}
+            for coords, seed in pending:
+                if self._in_range(*coords):
+                    self._push(coords, seed)
+
+    def get(self, timeout=None):
+        """Pop the nearest pending chunk as (chunk_x, chunk_y, seed).
+
+        Blocks up to `timeout` seconds and raises queue.Empty if nothing is
+        pending, like queue.Queue.get.
+        """
+        with self._condition:
+            if not self._pending:
+                self._condition.wait(timeout)
+            while self._heap:
+                priority, _, coords, seed = heapq.heappop(self._heap)
+                if coords is None:
+                    continue
+                del self._pending[coords]
+                self._in_progress.add(coords)
+                return coords[0], coords[1], seed
+            raise queue.Empty
+
+    def get_nowait(self):
+        """Pop the nearest pending chunk without waiting."""
+        return self.get(timeout=0)
+
+    def complete(self, coords):
+        """Mark popped chunks as finished (generated, failed or skipped)."""
+        with self._condition:
+            self._in_progress.difference_update(coords)
+
+    def is_pending(self, chunk_x, chunk_y):
+        """Check whether a chunk is queued or being generated."""
+        with self._condition:
+            return (chunk_x, chunk_y) in self._pending or (chunk_x, chunk_y) in self._in_progress
+
+    def qsize(self):
+        """Number of pending (not yet popped) requests."""
+        with self._condition:
+            return len(self._pending)
+
+    def clear(self):
+        """Drop every pending request."""
+        with self._condition:
+            self._heap = []
+            self._pending = {}
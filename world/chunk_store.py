@@ -0,0 +1,109 @@
+import threading
+
+class ChunkStore:
+    """Write-back cache in front of a RegionStore.
+
+    Chunks handed to write() are queued and written to disk by a background
+    thread, so unloading or saving never blocks the game loop on file I/O.
+    Queued chunks are still visible to load() until they reach the disk, and
+    a newer write of the same chunk replaces the queued one. on_written, if
+    given, is called from the writer thread with {coords: array} of the
+    chunks it has finished serializing.
+    """
+
+    def __init__(self, region_store, on_written=None):
+        self.region_store = region_store
+        self.on_written = on_written
+        self.directory = region_store.directory
+        self._pending = {}  # {(chunk_x, chunk_y): array} waiting to be written
+        self._in_flight = {}  # Chunks the writer is currently writing
+        self._condition = threading.Condition()
+        self._running = True
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+
+    def write(self, chunks):
+        """Queue chunks {(chunk_x, chunk_y): array} for writing.
+
+        The arrays are not copied and must not be modified until they are
+        written: pass arrays nobody edits anymore (unloaded chunks), or pin
+        them until on_written reports them, as chunks.snapshot_world does.
+        """
+        if not chunks:
+            return
+        with self._condition:
+            self._pending.update(chunks)
+            self._condition.notify_all()
+
+    def load(self, chunk_x, chunk_y):
+        """Return a stored chunk (queued or on disk), or None if it was never saved."""
+        with self._condition:
+            chunk = self._pending.get((chunk_x, chunk_y))
+            if chunk is None:
+                chunk = self._in_flight.get((chunk_x, chunk_y))
+            if chunk is not None:
+                return chunk.copy()
+        return self.region_store.load_chunk(chunk_x, chunk_y)
+
+    def has_chunk(self, chunk_x, chunk_y):
+        with self._condition:
+            if (chunk_x, chunk_y) in self._pending or (chunk_x, chunk_y) in self._in_flight:
+                return True
+        return self.region_store.has_chunk(chunk_x, chunk_y)
+
+    def pending_count(self):
+        """Number of chunks not yet written to disk."""
+        with self._condition:
+            return len(self._pending) + len(self._in_flight)
+
+    def _writer_loop(self):
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                self._in_flight, self._pending = self._pending, {}
+
+            written = None
+            try:
+                self.region_store.save_chunks(self._in_flight)
+                written = self._in_flight
+            except Exception as e:
+                print(f"Error writing {len(self._in_flight)} chunks to {self.directory}: {e}")
+                # Requeue the chunks unless a newer version was queued meanwhile
+                with self._condition:
+                    for coords, chunk in self._in_flight.items():
+                        self._pending.setdefault(coords, chunk)
+
+            with self._condition:
+                if written:
+                    # Arrays queued again meanwhile are not done yet
+                    written = {coords: chunk for coords, chunk in written.items()
+                               if self._pending.get(coords) is not chunk}
+                self._in_flight = {}
+                self._condition.notify_all()
+                if self._pending and self._running:
+                    # Avoid spinning on a failing disk
+                    self._condition.wait(1.0)
+            
+            # Outside the condition: the callback may take other locks held while calling write()
+            if written and self.on_written is not None:
+                try:
+                    self.on_written(written)
+                except Exception as e:
+                    print(f"Error releasing written chunks: {e}")
+
+    def flush(self, timeout=None):
+        """Wait until every queued chunk has been written. Returns False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._pending and not self._in_flight, timeout)
+
+    def close(self, timeout=5.0):
+        """Write the remaining chunks and stop the writer thread."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        self._writer.join(timeout)
+        self.region_store.close()
@@ -1,15 +1,25 @@
 import numpy as np
 import threading
 import queue
-import time
 import json
 import os
+import sys
 import traceback
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from world.map_generation import generate_chunk as gen_chunk_terrain
+from world.map_generation import generate_region as gen_region_terrain
+from world.chunk_scheduler import ChunkRequestScheduler
+from world.region_storage import RegionStore
+from world.chunk_store import ChunkStore
+from world.uniform_chunk import UniformChunk, compact_chunk
+from utils.render_cache import RenderCache
 from core import config
 
 # Importer la détection GPU et génération GPU
-from utils.gpu_detection import GPU_AVAILABLE, detect_gpu
+from utils.gpu_detection import GPU_AVAILABLE
 # Import conditionnel pour la génération GPU
 GPU_GENERATION = False
 try:
@@ -25,12 +35,23 @@ else:
 
 # Global variables to store world data
 loaded_chunks = {}  # Dictionary to store loaded chunks {(chunk_x, chunk_y): numpy_array}
-modified_chunks = set()  # Set to track modified chunks for saving
-chunk_cache = {}  # Dictionary to store rendered chunks for performance
-chunk_generation_queue = queue.Queue()  # Queue for chunk generation tasks
+chunk_versions = {}  # {(chunk_x, chunk_y): generation}, a new generation every time a chunk's blocks change
+saved_versions = {}  # Generation last handed to the chunk store; unsaved when it differs from chunk_versions
+rendered_versions = {}  # Generation drawn into chunk_cache; needs redrawing when it differs from chunk_versions
+pinned_chunks = set()  # Chunks whose array is queued in the chunk store (copied on next write until written)
+chunk_cache = RenderCache(config.CHUNK_CACHE_BUDGET, "chunks")  # Rendered chunk surfaces, LRU within a byte budget
+dirty_cells = {}  # {(chunk_x, chunk_y): [min_x, min_y, max_x, max_y]} cells to redraw in the cached surface
+chunk_scheduler = ChunkRequestScheduler()  # Deduplicated, nearest-first chunk generation requests
 chunk_worker_running = False  # Flag to control worker threads
 origin_chunk_backup = None  # Backup for the origin chunk
 chunk_lock = threading.RLock()  # Lock for thread-safe dictionary access
+REGION_BATCH_LIMIT = 64  # Maximum queued chunk requests a worker merges into one region
+chunk_store = None  # ChunkStore holding saved and unloaded chunks, see open_chunk_store
+_version_counter = itertools.count(1)  # Generations are never reused, even after a chunk is unloaded
+
+# Process backend state
+process_pool = None  # ProcessPoolExecutor when the "process" backend is active
+generated_chunk_results = queue.Queue()  # Regions returned by worker processes, merged on the main thread
 
 def get_chunk_coords(block_x, block_y):
     """Get the chunk coordinates that contain the given block position."""
@@ -53,7 +74,7 @@ def get_block_at(block_x, block_y):
         local_x = block_x % config.CHUNK_SIZE
         local_y = block_y % config.CHUNK_SIZE
         
-        return loaded_chunks[(chunk_x, chunk_y)][local_y, local_x]
+        return int(loaded_chunks[(chunk_x, chunk_y)][local_y, local_x])
 
 def set_block_at(block_x, block_y, block_type):
     """Set the block type at the given position."""
@@ -65,67 +86,227 @@ def set_block_at(block_x, block_y, block_type):
     local_x = block_x % config.CHUNK_SIZE
     local_y = block_y % config.CHUNK_SIZE
     
-    # Update the block
-    loaded_chunks[(chunk_x, chunk_y)][local_y, local_x] = block_type
+    chunk = loaded_chunks[(chunk_x, chunk_y)]
+    if isinstance(chunk, UniformChunk):
+        if chunk.value == block_type:
+            return True  # Nothing changes
+        # Promote to a real array on first write
+        chunk = chunk.to_array()
+        loaded_chunks[(chunk_x, chunk_y)] = chunk
+    elif (chunk_x, chunk_y) in pinned_chunks:
+        # Copy-on-write: a save snapshot may still be reading this array
+        chunk = chunk.copy()
+        loaded_chunks[(chunk_x, chunk_y)] = chunk
+        pinned_chunks.discard((chunk_x, chunk_y))
     
-    # Mark the chunk as modified
-    modified_chunks.add((chunk_x, chunk_y))
+    # Update the block
+    chunk[local_y, local_x] = block_type
     
-    # Clear the chunk from the rendering cache
-    if (chunk_x, chunk_y) in chunk_cache:
-        del chunk_cache[(chunk_x, chunk_y)]
+    # Mark the chunk as modified; only the changed cell needs redrawing
+    mark_cell_dirty(chunk_x, chunk_y, local_x, local_y)
     
     return True
 
+def bump_chunk_version(chunk_x, chunk_y):
+    """Start a new generation for a chunk, so it is both redrawn and saved again."""
+    version = next(_version_counter)
+    chunk_versions[(chunk_x, chunk_y)] = version
+    return version
+
+def mark_chunk_generated(chunk_x, chunk_y):
+    """New generation for a freshly generated chunk, which counts as saved: the seed rebuilds it."""
+    version = bump_chunk_version(chunk_x, chunk_y)
+    saved_versions[(chunk_x, chunk_y)] = version
+    return version
+
+def is_chunk_unsaved(chunk_x, chunk_y):
+    """Check whether a chunk changed since it was last handed to the chunk store."""
+    version = chunk_versions.get((chunk_x, chunk_y))
+    return version is not None and saved_versions.get((chunk_x, chunk_y)) != version
+
+def get_unsaved_chunk_count():
+    with chunk_lock:
+        return sum(1 for coords, version in chunk_versions.items() if saved_versions.get(coords) != version)
+
+def mark_cell_dirty(chunk_x, chunk_y, local_x, local_y):
+    """Grow the chunk's dirty rectangle so the renderer redraws this cell."""
+    coords = (chunk_x, chunk_y)
+    if rendered_versions.get(coords) == chunk_versions.get(coords):
+        # Rendered surface is up to date: start a new rectangle
+        dirty_cells[coords] = [local_x, local_y, local_x, local_y]
+    else:
+        rect = dirty_cells.get(coords)
+        if rect is not None:
+            rect[0] = min(rect[0], local_x)
+            rect[1] = min(rect[1], local_y)
+            rect[2] = max(rect[2], local_x)
+            rect[3] = max(rect[3], local_y)
+        # Otherwise a full redraw is already pending
+    bump_chunk_version(chunk_x, chunk_y)
+
 def mark_chunk_modified(chunk_x, chunk_y):
     """Mark a chunk as modified."""
     if (chunk_x, chunk_y) in loaded_chunks:
-        modified_chunks.add((chunk_x, chunk_y))
-        
-        # Clear the chunk from the rendering cache
-        if (chunk_x, chunk_y) in chunk_cache:
-            del chunk_cache[(chunk_x, chunk_y)]
+        # Redraw the whole chunk (into its cached surface)
+        dirty_cells.pop((chunk_x, chunk_y), None)
+        bump_chunk_version(chunk_x, chunk_y)
+
+def _drain_generation_queue(first_task):
+    """Collect the nearest pending requests after first_task so they can be generated together."""
+    tasks = [first_task]
+    while len(tasks) < REGION_BATCH_LIMIT:
+        try:
+            tasks.append(chunk_scheduler.get_nowait())
+        except queue.Empty:
+            break
+    return tasks
 
 def generate_chunk_worker():
-    """Worker function to generate chunks from the queue."""
+    """Worker function to generate chunks from the scheduler."""
     global chunk_worker_running
     while chunk_worker_running:
         try:
-            # Get a task from the queue with a timeout
-            task = chunk_generation_queue.get(timeout=0.1)
-            chunk_x, chunk_y, seed = task
-            
-            # Skip if the chunk is already loaded
+            # Get the nearest requested chunk, waiting briefly if there is none
+            task = chunk_scheduler.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        
+        tasks = _drain_generation_queue(task)
+        seed = task[2]
+        pending = set()
+        try:
+            # Skip chunks that were loaded since they were requested
             with chunk_lock:
-                if (chunk_x, chunk_y) in loaded_chunks:
-                    chunk_generation_queue.task_done()
-                    continue
+                pending = {(cx, cy) for cx, cy, _ in tasks if (cx, cy) not in loaded_chunks}
+            pending -= load_stored_chunks(pending)
                     
-            # Generate the chunk
-            try:
-                generate_chunk(chunk_x, chunk_y, seed)
-                print(f"Worker generated chunk at ({chunk_x}, {chunk_y})")
-            except Exception as e:
-                print(f"Error generating chunk ({chunk_x}, {chunk_y}) in worker: {e}")
-            
-            # Mark task as done
-            chunk_generation_queue.task_done()
-            
+            # Generate the chunks, batched into regions where possible
+            if pending:
+                generate_chunks_batched(pending, seed)
+                print(f"Worker generated {len(pending)} chunks")
+        except Exception as e:
+            print(f"Error generating chunks {sorted(pending)} in worker: {e}")
+        finally:
+            chunk_scheduler.complete((cx, cy) for cx, cy, _ in tasks)
+
+def _generate_region_in_process(chunk_x0, chunk_y0, width, height, seed):
+    """Runs in a worker process: generate a region and return its chunks."""
+    region = gen_region_terrain(chunk_x0, chunk_y0, width, height, seed)
+    return [(chunk_x, chunk_y, chunk) for (chunk_x, chunk_y), chunk in region.items()]
+
+def _queue_generated_region(coords, future):
+    """Executor callback: hand finished regions, with the chunks requested from them, to the main thread."""
+    try:
+        generated_chunk_results.put((coords, future.result()))
+    except Exception as e:
+        print(f"Error generating chunks {sorted(coords)} in worker process: {e}")
+        chunk_scheduler.complete(coords)
+
+def process_dispatch_worker(num_processes):
+    """Thread that batches scheduled requests and submits them to the process pool."""
+    global chunk_worker_running
+    while chunk_worker_running:
+        try:
+            task = chunk_scheduler.get(timeout=0.1)
+        except queue.Empty:
+            continue
         
+        tasks = _drain_generation_queue(task)
+        seed = task[2]
+        requested = {(cx, cy) for cx, cy, _ in tasks}
+        pending = set()
+        try:
+            # Skip chunks that were loaded since they were requested
+            with chunk_lock:
+                pending = {coords for coords in requested if coords not in loaded_chunks}
+            pending -= load_stored_chunks(pending)
+            chunk_scheduler.complete(requested - pending)
             
-        except queue.Empty:
-            # Queue is empty, continue waiting
-            time.sleep(0.5)
+            # Split clustered requests into bands so every process gets work.
+            # Pending chunks stay in progress until they are merged.
+            if pending:
+                for chunk_x0, chunk_y0, width, height in _plan_regions(pending, num_processes):
+                    coords = {(cx, cy) for cx in range(chunk_x0, chunk_x0 + width)
+                              for cy in range(chunk_y0, chunk_y0 + height)} & pending
+                    future = process_pool.submit(_generate_region_in_process,
+                                                 chunk_x0, chunk_y0, width, height, seed)
+                    future.add_done_callback(partial(_queue_generated_region, coords))
         except Exception as e:
-            print(f"Error in chunk generation worker: {e}")
-            chunk_generation_queue.task_done()  # Mark task as done to avoid stalling
+            print(f"Error in chunk dispatch worker: {e}")
+            chunk_scheduler.complete(pending)
 
-def start_chunk_workers(num_workers, seed):
-    """Start worker threads for chunk generation."""
+def integrate_generated_chunks(max_regions=None):
+    """Merge chunks produced by worker processes into loaded_chunks.
+
+    Only the chunks that were requested from a region are merged: the rest
+    of its bounding box belongs to nobody, or to other batches. Chunks
+    loaded while the region was generating are kept as they are, and chunks
+    written to the chunk store meanwhile are loaded from it instead. Must be called from the main thread, typically once
+    per frame. Returns the number of chunks added.
+    """
+    added = 0
+    merged_regions = 0
+    while max_regions is None or merged_regions < max_regions:
+        try:
+            coords, region = generated_chunk_results.get_nowait()
+        except queue.Empty:
+            break
+        
+        stored = []
+        with chunk_lock:
+            for chunk_x, chunk_y, chunk in region:
+                if (chunk_x, chunk_y) not in coords or (chunk_x, chunk_y) in loaded_chunks:
+                    continue
+                if is_chunk_stored(chunk_x, chunk_y):
+                    # Unloaded with edits meanwhile; the saved chunk wins
+                    stored.append((chunk_x, chunk_y))
+                    continue
+                chunk = validate_and_align_chunk(chunk, chunk_x, chunk_y)
+                loaded_chunks[(chunk_x, chunk_y)] = compact_chunk(chunk)
+                mark_chunk_generated(chunk_x, chunk_y)
+                added += 1
+        added += len(load_stored_chunks(stored))
+        chunk_scheduler.complete(coords)
+        merged_regions += 1
+    return added
+
+def _start_process_pool(num_processes):
+    """Create the worker process pool, or return None if it is unavailable."""
+    global process_pool
+    # Only fork avoids re-running main.py's top-level game setup (spawn would), and forking a
+    # process that already set up SDL and the GPU is only safe on Linux (not on macOS)
+    if not sys.platform.startswith("linux") or "fork" not in multiprocessing.get_all_start_methods():
+        print("Process chunk generation needs Linux and the 'fork' start method, falling back to threads")
+        return None
+    try:
+        process_pool = ProcessPoolExecutor(max_workers=num_processes,
+                                           mp_context=multiprocessing.get_context("fork"))
+        # Fork the workers now rather than in the middle of the game loop
+        process_pool.submit(int).result()
+    except Exception as e:
+        print(f"Could not start chunk generation processes ({e}), falling back to threads")
+        process_pool = None
+    return process_pool
+
+def start_chunk_workers(num_workers, seed, backend="thread"):
+    """Start chunk generation workers.
+
+    backend is "thread" (worker threads generate and insert chunks directly)
+    or "process" (num_workers processes generate chunks, and the main thread
+    merges them with integrate_generated_chunks).
+    """
     global chunk_worker_running
     chunk_worker_running = True
     
     workers = []
+    if backend == "process" and _start_process_pool(num_workers):
+        print(f"Started {num_workers} chunk generation processes")
+        worker = threading.Thread(target=process_dispatch_worker, args=(num_workers,))
+        worker.daemon = True
+        worker.start()
+        workers.append(worker)
+        return workers
+    
     for _ in range(num_workers):
         worker = threading.Thread(target=generate_chunk_worker)
         worker.daemon = True
@@ -136,13 +317,21 @@ def start_chunk_workers(num_workers, seed):
 
 def stop_chunk_workers(workers):
     """Stop worker threads for chunk generation."""
-    global chunk_worker_running
+    global chunk_worker_running, process_pool
     chunk_worker_running = False
     
     # Wait for workers to finish
     for worker in workers:
         if worker.is_alive():
             worker.join(0.1)
+    
+    if process_pool is not None:
+        process_pool.shutdown(wait=False, cancel_futures=True)
+        process_pool = None
+
+# Lookup table of valid block IDs, indexed by block ID
+VALID_BLOCK_LUT = np.zeros(max(config.BLOCKS) + 1, dtype=bool)
+VALID_BLOCK_LUT[list(config.BLOCKS)] = True
 
 def align_chunk_borders(chunk, chunk_x, chunk_y):
     """Ensure the borders of the chunk align with adjacent chunks."""
@@ -165,50 +354,46 @@ def align_chunk_borders(chunk, chunk_x, chunk_y):
                 chunk[-1, :] = neighbor_chunk[0, :]
     return chunk
 
+def validate_chunk(chunk, chunk_x, chunk_y):
+    """Replace invalid block IDs with EMPTY in place. Returns the number of cells replaced."""
+    # Clip so IDs outside the table can be looked up; clipped cells are invalid anyway
+    lut_index = np.clip(chunk, 0, len(VALID_BLOCK_LUT) - 1)
+    invalid = ~VALID_BLOCK_LUT[lut_index] | (lut_index != chunk)
+    invalid_count = int(np.count_nonzero(invalid))
+    if invalid_count:
+        print(f"Replaced {invalid_count} invalid blocks with EMPTY in chunk ({chunk_x}, {chunk_y})")
+        chunk[invalid] = config.EMPTY
+    return invalid_count
+
 def validate_and_align_chunk(chunk, chunk_x, chunk_y):
-    """Validate the chunk and align its borders with adjacent chunks."""
-    # Vérifiez que tous les blocs générés sont valides
-    for y in range(config.CHUNK_SIZE):
-        for x in range(config.CHUNK_SIZE):
-            block_type = chunk[y, x]
-            if block_type not in config.BLOCKS:
-                print(f"Invalid block type {block_type} at ({x}, {y}) in chunk ({chunk_x}, {chunk_y}). Replacing with EMPTY.")
-                chunk[y, x] = config.EMPTY  # Remplacez les blocs non valides par EMPTY
-
-    # Alignez les bordures avec les chunks adjacents
-    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-        neighbor_coords = (chunk_x + dx, chunk_y + dy)
-        if neighbor_coords in loaded_chunks:
-            neighbor_chunk = loaded_chunks[neighbor_coords]
-            
-            # Alignez les bordures gauche/droite
-            if dx == -1:  # Chunk gauche
-                chunk[:, 0] = neighbor_chunk[:, -1]
-            elif dx == 1:  # Chunk droit
-                chunk[:, -1] = neighbor_chunk[:, 0]
-            
-            # Alignez les bordures haut/bas
-            if dy == -1:  # Chunk au-dessus
-                chunk[0, :] = neighbor_chunk[-1, :]
-            elif dy == 1:  # Chunk en dessous
-                chunk[-1, :] = neighbor_chunk[0, :]
-    return chunk
+    """Validate the chunk and align its borders with adjacent chunks.
+
+    This is the single validation point: every generated or loaded chunk
+    passes through here before it is added to loaded_chunks.
+    """
+    validate_chunk(chunk, chunk_x, chunk_y)
+    return align_chunk_borders(chunk, chunk_x, chunk_y)
 
 def generate_chunk(chunk_x, chunk_y, seed):
     """Generate a new chunk at the given position."""
     chunk_x = int(chunk_x)  # Ensure chunk_x is an integer
     chunk_y = int(chunk_y)  # Ensure chunk_y is an integer
+    
+    # Reuse the saved chunk if there is one, so edits survive unloading
+    if load_stored_chunks([(chunk_x, chunk_y)]):
+        return loaded_chunks[(chunk_x, chunk_y)]
+    
     print(f"Generating chunk at ({chunk_x}, {chunk_y})")
     
     # Create an empty chunk as a numpy array
-    chunk = np.zeros((config.CHUNK_SIZE, config.CHUNK_SIZE), dtype=np.int32)
+    chunk = np.zeros((config.CHUNK_SIZE, config.CHUNK_SIZE), dtype=config.CHUNK_DTYPE)
     chunk.fill(config.EMPTY)
     
     try:
         # Utiliser la génération GPU si disponible
         if GPU_GENERATION:
             print(f"Using GPU generation for chunk ({chunk_x}, {chunk_y})")
-            chunk = generate_chunk_gpu(chunk_x, chunk_y, seed)
+            chunk = generate_chunk_gpu(chunk_x, chunk_y, seed).astype(config.CHUNK_DTYPE)
         else:
             print(f"Using CPU generation for chunk ({chunk_x}, {chunk_y})")
             chunk = gen_chunk_terrain(chunk, chunk_x, chunk_y, seed)
@@ -219,25 +404,113 @@ def generate_chunk(chunk_x, chunk_y, seed):
         # Even if there's an error, we'll still create an empty chunk
     
     # Validez et alignez le chunk
-    chunk = validate_and_align_chunk(chunk, chunk_x, chunk_y)
+    chunk = compact_chunk(validate_and_align_chunk(chunk, chunk_x, chunk_y))
 
     # Add the chunk to the loaded chunks with lock to prevent race conditions
     with chunk_lock:
+        if (chunk_x, chunk_y) not in loaded_chunks and is_chunk_stored(chunk_x, chunk_y):
+            load_stored_chunks([(chunk_x, chunk_y)])  # Unloaded with edits while generating
+        if (chunk_x, chunk_y) in loaded_chunks:
+            return loaded_chunks[(chunk_x, chunk_y)]  # Keep the loaded or saved version
         loaded_chunks[(chunk_x, chunk_y)] = chunk
-        modified_chunks.add((chunk_x, chunk_y))
+        mark_chunk_generated(chunk_x, chunk_y)
         print(f"Chunk ({chunk_x}, {chunk_y}) successfully added to loaded_chunks")
 
     return chunk
 
+def generate_region(chunk_x0, chunk_y0, width, height, seed):
+    """Generate a rectangle of chunks in one batched computation.
+
+    Chunks in the rectangle that are already loaded are left untouched.
+    Returns a dict of the newly added chunks.
+    """
+    chunk_x0 = int(chunk_x0)
+    chunk_y0 = int(chunk_y0)
+    stored = load_stored_chunks([(chunk_x, chunk_y)
+                                 for chunk_y in range(chunk_y0, chunk_y0 + height)
+                                 for chunk_x in range(chunk_x0, chunk_x0 + width)])
+    if len(stored) == width * height:
+        return {}
+    print(f"Generating region of {width}x{height} chunks at ({chunk_x0}, {chunk_y0})")
+    
+    try:
+        region = gen_region_terrain(chunk_x0, chunk_y0, width, height, seed)
+    except Exception as e:
+        print(f"Error generating region at ({chunk_x0}, {chunk_y0}): {e}. Falling back to single chunks.")
+        region = {}
+        for chunk_y in range(chunk_y0, chunk_y0 + height):
+            for chunk_x in range(chunk_x0, chunk_x0 + width):
+                if (chunk_x, chunk_y) not in loaded_chunks:
+                    region[(chunk_x, chunk_y)] = generate_chunk(chunk_x, chunk_y, seed)
+        return region
+    
+    added = {}
+    stored = []
+    with chunk_lock:
+        for (chunk_x, chunk_y), chunk in region.items():
+            if (chunk_x, chunk_y) in loaded_chunks:
+                continue
+            if is_chunk_stored(chunk_x, chunk_y):
+                stored.append((chunk_x, chunk_y))  # Unloaded while generating
+                continue
+            chunk = compact_chunk(validate_and_align_chunk(chunk, chunk_x, chunk_y))
+            loaded_chunks[(chunk_x, chunk_y)] = chunk
+            mark_chunk_generated(chunk_x, chunk_y)
+            added[(chunk_x, chunk_y)] = chunk
+    for coords in load_stored_chunks(stored):
+        added[coords] = loaded_chunks[coords]
+    
+    print(f"Region at ({chunk_x0}, {chunk_y0}) added {len(added)} chunks to loaded_chunks")
+    return added
+
+def _plan_regions(coords, bands=1):
+    """Group chunk coordinates into (chunk_x0, chunk_y0, width, height) rectangles.
+
+    Clustered coordinates become their bounding box, split into up to
+    `bands` horizontal strips; scattered ones stay single chunks.
+    """
+    min_x = min(cx for cx, _ in coords)
+    max_x = max(cx for cx, _ in coords)
+    min_y = min(cy for _, cy in coords)
+    max_y = max(cy for _, cy in coords)
+    width = max_x - min_x + 1
+    height = max_y - min_y + 1
+    
+    # Only batch when the bounding box is mostly made of requested chunks
+    if width * height > 2 * len(coords):
+        return [(cx, cy, 1, 1) for cx, cy in sorted(coords)]
+    
+    rows_per_band = -(-height // max(1, min(bands, height)))
+    return [(min_x, y, width, min(rows_per_band, max_y + 1 - y))
+            for y in range(min_y, max_y + 1, rows_per_band)]
+
+def generate_chunks_batched(coords, seed):
+    """Generate a set of chunk coordinates, using one region when they are clustered."""
+    for chunk_x0, chunk_y0, width, height in _plan_regions(set(coords)):
+        if width == 1 and height == 1:
+            generate_chunk(chunk_x0, chunk_y0, seed)
+        else:
+            generate_region(chunk_x0, chunk_y0, width, height, seed)
+
+def request_chunks_around(chunk_x, chunk_y, radius, seed):
+    """Schedule every missing chunk in the square around a chunk, nearest first.
+
+    Moving the center re-prioritizes pending requests and cancels the ones
+    that are now out of range. Chunks already pending are not queued twice.
+    """
+    chunk_scheduler.set_focus(chunk_x, chunk_y, radius)
+    missing = [(chunk_x + dx, chunk_y + dy)
+               for dy in range(-radius, radius + 1)
+               for dx in range(-radius, radius + 1)
+               if (chunk_x + dx, chunk_y + dy) not in loaded_chunks]
+    if missing:
+        chunk_scheduler.request_many(missing, seed)
+    return len(missing)
+
 def ensure_chunks_around_point(x, y, radius):
     """Ensure chunks are loaded around a point with optimized checks."""
     chunk_x, chunk_y = get_chunk_coords(x, y)
-    for dy in range(-radius, radius + 1):
-        for dx in range(-radius, radius + 1):
-            cx = int(chunk_x + dx)
-            cy = int(chunk_y + dy)
-            if (cx, cy) not in loaded_chunks:
-                chunk_generation_queue.put((cx, cy, config.SEED))
+    request_chunks_around(chunk_x, chunk_y, radius, config.SEED)
 
 def unload_distant_chunks(world_x, world_y, unload_distance):
     """Unload chunks that are too far from a given position."""
@@ -248,30 +521,40 @@ def unload_distant_chunks(world_x, world_y, unload_distance):
     # Calculate squared unload distance to avoid square root
     squared_unload_distance = unload_distance * unload_distance * config.CHUNK_SIZE * config.CHUNK_SIZE
     
-    # Find chunks to unload
-    chunks_to_unload = []
-    for chunk_pos in loaded_chunks.keys():
-        chunk_x, chunk_y = chunk_pos
-        dx = (chunk_x - center_chunk_x) * config.CHUNK_SIZE
-        dy = (chunk_y - center_chunk_y) * config.CHUNK_SIZE
-        squared_distance = dx * dx + dy * dy
+    with chunk_lock:
+        # Find chunks to unload
+        chunks_to_unload = []
+        for chunk_pos in loaded_chunks.keys():
+            chunk_x, chunk_y = chunk_pos
+            dx = (chunk_x - center_chunk_x) * config.CHUNK_SIZE
+            dy = (chunk_y - center_chunk_y) * config.CHUNK_SIZE
+            squared_distance = dx * dx + dy * dy
+            
+            if squared_distance > squared_unload_distance:
+                chunks_to_unload.append(chunk_pos)
         
-        if squared_distance > squared_unload_distance:
-            chunks_to_unload.append(chunk_pos)
-    
-    # Unload chunks
-    for chunk_pos in chunks_to_unload:
-        if chunk_pos in modified_chunks:
-            # TODO: Save modified chunks before unloading
-            pass
+        # Unload chunks; unsaved ones are handed to the chunk store's writer
+        evicted = {}
+        for chunk_pos in chunks_to_unload:
+            chunk = loaded_chunks.pop(chunk_pos)
+            pinned_chunks.discard(chunk_pos)
+            if is_chunk_unsaved(*chunk_pos):
+                evicted[chunk_pos] = chunk
+            
+            # Forget its generations; render tiles holding it see the change
+            chunk_versions.pop(chunk_pos, None)
+            saved_versions.pop(chunk_pos, None)
+            rendered_versions.pop(chunk_pos, None)
+            chunk_cache.invalidate(chunk_pos)
+            dirty_cells.pop(chunk_pos, None)
         
-        # Remove from loaded chunks and caches
-        if chunk_pos in loaded_chunks:
-            del loaded_chunks[chunk_pos]
-        if chunk_pos in chunk_cache:
-            del chunk_cache[chunk_pos]
-        if chunk_pos in modified_chunks:
-            modified_chunks.remove(chunk_pos)
+        # Queue them before releasing the lock, so generation in flight sees them as stored
+        if evicted:
+            if chunk_store is not None:
+                chunk_store.write(evicted)
+            else:
+                print(f"Warning: no chunk store open, discarding {len(evicted)} unsaved chunks")
+    return len(chunks_to_unload)
 
 def get_active_chunks(player_x, player_y, screen_width, screen_height, view_multiplier, max_chunks):
     """Get active chunks that should be rendered based on the player's position."""
@@ -285,14 +568,20 @@ def get_active_chunks(player_x, player_y, screen_width, screen_height, view_mult
     
     # Get chunks in the visible area
     active_chunks = []
-    for dx in range(-chunks_x, chunks_x + 1):
-        for dy in range(-chunks_y, chunks_y + 1):
-            chunk_x = center_chunk_x + dx
-            chunk_y = center_chunk_y + dy
-            
-            # Add chunk if it's loaded
-            if (chunk_x, chunk_y) in loaded_chunks:
+    if (2 * chunks_x + 1) * (2 * chunks_y + 1) > len(loaded_chunks):
+        # Large views: filter the loaded chunks instead of scanning the whole area
+        for chunk_x, chunk_y in list(loaded_chunks):
+            if abs(chunk_x - center_chunk_x) <= chunks_x and abs(chunk_y - center_chunk_y) <= chunks_y:
                 active_chunks.append((chunk_x, chunk_y))
+    else:
+        for dx in range(-chunks_x, chunks_x + 1):
+            for dy in range(-chunks_y, chunks_y + 1):
+                chunk_x = center_chunk_x + dx
+                chunk_y = center_chunk_y + dy
+                
+                # Add chunk if it's loaded
+                if (chunk_x, chunk_y) in loaded_chunks:
+                    active_chunks.append((chunk_x, chunk_y))
     
     # Limit the number of active chunks if necessary
     if len(active_chunks) > max_chunks:
@@ -302,40 +591,182 @@ def get_active_chunks(player_x, player_y, screen_width, screen_height, view_mult
     
     return active_chunks
 
-def save_world_to_file(filename, storage_system=None):
-    """Save the world state to a file."""
-    global loaded_chunks, modified_chunks
+_region_stores = {}  # {directory: RegionStore}, kept open between saves
+
+def load_stored_chunks(coords):
+    """Load saved chunks from the chunk store instead of regenerating them.
+
+    Returns the set of coordinates that were found and added to loaded_chunks.
+    """
+    if chunk_store is None:
+        return set()
+    found = {}
+    for chunk_x, chunk_y in coords:
+        try:
+            chunk = chunk_store.load(chunk_x, chunk_y)
+        except Exception as e:
+            print(f"Error loading stored chunk ({chunk_x}, {chunk_y}): {e}")
+            continue
+        if chunk is not None:
+            found[(chunk_x, chunk_y)] = chunk
     
+    loaded = set()
+    with chunk_lock:
+        for coords, chunk in found.items():
+            if coords not in loaded_chunks:
+                loaded_chunks[coords] = compact_chunk(chunk)
+                # Same data as the store: needs rendering, not saving
+                saved_versions[coords] = bump_chunk_version(*coords)
+            loaded.add(coords)
+    return loaded
+
+def is_chunk_stored(chunk_x, chunk_y):
+    """Check whether the chunk store holds a chunk, queued for writing or on disk.
+
+    The store is the source of truth for chunks that are not loaded:
+    generated terrain must never replace a stored chunk.
+    """
+    if chunk_store is None:
+        return False
     try:
-        # Determine the directory to save the file in
-        data_dir = os.path.dirname(filename)
-        if not data_dir:
-            data_dir = "."  # Use current directory if filename only has the file name
-        
-        # Create the directory if it doesn't exist
-        os.makedirs(data_dir, exist_ok=True)
-        
-        # Prepare chunk data for saving
-        chunk_data = {}
-        for (chunk_x, chunk_y), chunk in loaded_chunks.items():
-            # Convert NumPy array to list for JSON serialization
-            chunk_data[f"{chunk_x},{chunk_y}"] = chunk.tolist()
-        
-        # Prepare world data for saving
-        world_data = {
-            "chunks": chunk_data,
-            "player_x": 0,  # Example player data
-            "player_y": 0,
-            "seed": config.SEED
-        }
-        
-        # Save the world data to the file
-        with open(filename, "w") as f:
-            json.dump(world_data, f)
-        
-        print(f"World saved to {filename}")
+        return chunk_store.has_chunk(chunk_x, chunk_y)
+    except Exception as e:
+        print(f"Error checking stored chunk ({chunk_x}, {chunk_y}): {e}")
+        return True  # Safer to reload than to overwrite edits
+
+def get_region_directory(filename):
+    """Directory holding the region files that belong to a save file."""
+    return os.path.splitext(filename)[0] + "_regions"
+
+def get_region_store(directory):
+    """Return the (cached) RegionStore for a directory."""
+    store = _region_stores.get(directory)
+    if store is None:
+        store = RegionStore(directory)
+        _region_stores[directory] = store
+    return store
+
+def open_chunk_store(filename):
+    """Use the region files of a save file as the chunk store.
+
+    Unloaded chunks are written there, and chunk generation reads them back
+    instead of regenerating. Returns the store.
+    """
+    global chunk_store
+    directory = get_region_directory(filename)
+    if chunk_store is None or chunk_store.directory != directory:
+        if chunk_store is not None:
+            chunk_store.close()
+        chunk_store = ChunkStore(get_region_store(directory), on_written=_unpin_written_chunks)
+    return chunk_store
+
+def _unpin_written_chunks(written):
+    """Chunk store callback: arrays it has written can be edited in place again."""
+    with chunk_lock:
+        for coords, chunk in written.items():
+            # Only if the loaded array is still the one written (not replaced or edited since)
+            if loaded_chunks.get(coords) is chunk:
+                pinned_chunks.discard(coords)
+
+def snapshot_world(filename, storage_system=None):
+    """Capture everything changed since the last snapshot, for saving.
+
+    Changed chunks are queued in the chunk store of `filename` right away
+    (so reloading them sees the new data) and their coordinates returned
+    with the world metadata. Chunk arrays are not copied: they are pinned
+    instead, and set_block_at copies a pinned chunk before its next edit.
+    The pin is released once the chunk store has written the array. This
+    makes the snapshot cheap enough to take on the game loop.
+    """
+    with chunk_lock:
+        chunks = {coords: loaded_chunks[coords] for coords, version in chunk_versions.items()
+                  if saved_versions.get(coords) != version and coords in loaded_chunks}
+        pinned_chunks.update(coords for coords, chunk in chunks.items()
+                             if not isinstance(chunk, UniformChunk))
+        saved_versions.update((coords, chunk_versions[coords]) for coords in chunks)
+    open_chunk_store(filename).write(chunks)
+    
+    metadata = {
+        "format": "regions",
+        "player_x": 0,  # Example player data
+        "player_y": 0,
+        "seed": config.SEED
+    }
+    if storage_system is not None:
+        # Reused as is when no storage changed since the last save
+        metadata["storage"] = storage_system.get_save_data()
+    return list(chunks), metadata
+
+def write_world_snapshot(filename, metadata, fsync=False):
+    """Finish a snapshot_world() save. Safe to call from a background thread.
+
+    Waits for the queued chunks to reach the region files, then replaces
+    the metadata file atomically so a crash never leaves a half-written save.
+    """
+    # Create the directory if it doesn't exist
+    data_dir = os.path.dirname(filename) or "."
+    os.makedirs(data_dir, exist_ok=True)
+    
+    store = open_chunk_store(filename)
+    if not store.flush(timeout=30):
+        raise IOError(f"{store.pending_count()} chunks still waiting to be written")
+    store.region_store.flush(fsync)
+    
+    metadata = dict(metadata, region_directory=os.path.basename(store.directory))
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, "w") as f:
+        json.dump(metadata, f)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temp_filename, filename)
+
+def save_world_to_file(filename, storage_system=None):
+    """Save the world state to a file, blocking until it is written.
+
+    The file itself only holds world metadata; chunks go to region files
+    next to it, and only chunks changed since the last save are written.
+    Chunks unloaded earlier are already queued in the chunk store, which is
+    flushed here. See world.autosave for saving without blocking.
+    """
+    try:
+        chunks, metadata = snapshot_world(filename, storage_system)
+        write_world_snapshot(filename, metadata, config.AUTOSAVE_FSYNC)
+        print(f"World saved to {filename} ({len(chunks)} chunks written)")
+        return True
     except Exception as e:
         print(f"Error saving world: {e}")
+        return False
+
+def _load_legacy_chunks(chunk_data):
+    """Load chunks from the old format that stored every chunk as JSON lists."""
+    for coord_str, chunk_array in chunk_data.items():
+        try:
+            # Parse chunk coordinates
+            x_str, y_str = coord_str.strip('()').split(',')
+            chunk_x, chunk_y = int(x_str), int(y_str)
+            
+            # Convert chunk data to numpy array
+            chunk = np.array(chunk_array, dtype=config.CHUNK_DTYPE)
+            
+            # Ensure correct chunk dimensions
+            if chunk.shape != (config.CHUNK_SIZE, config.CHUNK_SIZE):
+                print(f"Warning: Chunk at {chunk_x},{chunk_y} has wrong dimensions {chunk.shape}, resizing")
+                # Resize chunk to correct dimensions if needed
+                new_chunk = np.zeros((config.CHUNK_SIZE, config.CHUNK_SIZE), dtype=config.CHUNK_DTYPE)
+                min_y = min(chunk.shape[0], config.CHUNK_SIZE)
+                min_x = min(chunk.shape[1], config.CHUNK_SIZE)
+                new_chunk[:min_y, :min_x] = chunk[:min_y, :min_x]
+                chunk = new_chunk
+            
+            # Store the chunk; it is rewritten as region data on the next save
+            validate_chunk(chunk, chunk_x, chunk_y)
+            loaded_chunks[(chunk_x, chunk_y)] = compact_chunk(chunk)
+            bump_chunk_version(chunk_x, chunk_y)
+            
+        except Exception as e:
+            print(f"Error loading chunk {coord_str}: {e}")
+            continue
 
 def load_world_from_file(filename, storage_system=None):
     """Load the world from a file."""
@@ -352,38 +783,21 @@ def load_world_from_file(filename, storage_system=None):
         with chunk_lock:
             # Clear existing chunks to prevent conflicts
             loaded_chunks.clear()
-            modified_chunks.clear()
-            
-            # Load chunks from file
-            chunk_data = data.get('chunks', {})
-            print(f"Found {len(chunk_data)} chunks in save file")
+            chunk_versions.clear()
+            saved_versions.clear()
+            rendered_versions.clear()
+            dirty_cells.clear()
+            pinned_chunks.clear()
             
-            for coord_str, chunk_array in chunk_data.items():
-                try:
-                    # Parse chunk coordinates
-                    x_str, y_str = coord_str.strip('()').split(',')
-                    chunk_x, chunk_y = int(x_str), int(y_str)
-                    
-                    # Convert chunk data to numpy array
-                    chunk = np.array(chunk_array, dtype=np.int32)
-                    
-                    # Ensure correct chunk dimensions
-                    if chunk.shape != (config.CHUNK_SIZE, config.CHUNK_SIZE):
-                        print(f"Warning: Chunk at {chunk_x},{chunk_y} has wrong dimensions {chunk.shape}, resizing")
-                        # Resize chunk to correct dimensions if needed
-                        new_chunk = np.zeros((config.CHUNK_SIZE, config.CHUNK_SIZE), dtype=np.int32)
-                        min_y = min(chunk.shape[0], config.CHUNK_SIZE)
-                        min_x = min(chunk.shape[1], config.CHUNK_SIZE)
-                        new_chunk[:min_y, :min_x] = chunk[:min_y, :min_x]
-                        chunk = new_chunk
-                    
-                    # Store the chunk
-                    loaded_chunks[(chunk_x, chunk_y)] = chunk
-                    print(f"Loaded chunk at ({chunk_x}, {chunk_y})")
-                    
-                except Exception as e:
-                    print(f"Error loading chunk {coord_str}: {e}")
-                    continue
+            if "chunks" in data:
+                # Old single-file JSON save
+                chunk_data = data["chunks"]
+                print(f"Found {len(chunk_data)} chunks in legacy save file")
+                _load_legacy_chunks(chunk_data)
+        
+        # Region chunks are read on demand when chunks around the player are requested
+        store = open_chunk_store(filename)
+        print(f"Using region files in {store.directory}")
         
         # Load additional data (storage, machines, etc.)
         if 'storage' in data and storage_system:
@@ -405,25 +819,28 @@ def ensure_origin_chunk_exists():
             if origin_chunk_backup is not None:
                 print("Restoring origin chunk from backup")
                 loaded_chunks[(0, 0)] = origin_chunk_backup.copy()
-                modified_chunks.add((0, 0))
+                bump_chunk_version(0, 0)
             else:
                 print("Creating new origin chunk")
                 # Create a basic chunk with empty top half and dirt/stone bottom half
-                chunk = np.zeros((config.CHUNK_SIZE, config.CHUNK_SIZE), dtype=np.int32)
+                chunk = np.zeros((config.CHUNK_SIZE, config.CHUNK_SIZE), dtype=config.CHUNK_DTYPE)
                 # Top half is air
                 chunk[:config.CHUNK_SIZE//2, :] = config.EMPTY
                 # Bottom half is dirt/stone
                 chunk[config.CHUNK_SIZE//2:, :] = config.DIRT
                 loaded_chunks[(0, 0)] = chunk
-                modified_chunks.add((0, 0))
+                bump_chunk_version(0, 0)
             print("Origin chunk is now present")
         return loaded_chunks[(0, 0)]
 
 # Make sure the function is named so it can be imported
 __all__ = [
-    'get_chunk_coords', 'get_block_at', 'set_block_at', 'mark_chunk_modified',
-    'generate_chunk', 'start_chunk_workers', 'stop_chunk_workers',
+    'get_chunk_coords', 'get_block_at', 'set_block_at', 'mark_chunk_modified', 'mark_cell_dirty',
+    'generate_chunk', 'generate_region', 'start_chunk_workers', 'stop_chunk_workers',
+    'integrate_generated_chunks',
     'ensure_chunks_around_point_optimized', 'unload_distant_chunks', 'get_active_chunks',
     'save_world_to_file', 'load_world_from_file', 'chunk_lock',
-    'ensure_origin_chunk_exists', 'chunk_generation_queue', 'loaded_chunks'  # Add these exports
+    'ensure_origin_chunk_exists', 'chunk_scheduler', 'request_chunks_around', 'loaded_chunks',  # Add these exports
+    'bump_chunk_version', 'mark_chunk_generated', 'is_chunk_unsaved', 'get_unsaved_chunk_count', 'get_region_store', 'get_region_directory',
+    'open_chunk_store', 'load_stored_chunks', 'is_chunk_stored', 'snapshot_world', 'write_world_snapshot'
 ]
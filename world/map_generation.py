@@ -2,9 +2,10 @@ import pygame
 import numpy as np
 import random
 import core.config as config
-from scipy.ndimage import gaussian_filter
+from scipy.ndimage import gaussian_filter, gaussian_filter1d
 import math
 
+from core.perlin import permutation_table, octave_noise_array
 from world.biomes import get_biome
 
 # Create a simple Perlin noise implementation
@@ -68,139 +69,111 @@ def octave_noise(perlin, x, y, octaves=1, persistence=0.5, lacunarity=2.0):
         frequency *= lacunarity
     return total / max_value if max_value > 0 else 0
 
-def generate_chunk(chunk_array, chunk_x, chunk_y, seed):
-    """Generates terrain for a chunk in Terraria style with biomes."""
-    # Use a fixed seed for the entire world
-    world_seed = seed
-    perlin = PerlinNoise(seed=world_seed)
-    
-    # Global world coordinates
-    world_offset_x = chunk_x * config.CHUNK_SIZE
-    world_offset_y = chunk_y * config.CHUNK_SIZE
-    
-    # Select biome based on world position
-    biome = get_biome(world_offset_x, world_offset_y, seed)
-    
-    # Constants from biome properties
-    SURFACE_BLOCK = biome.surface_block
-    DIRT_DEPTH = biome.dirt_depth
+# Scale factors for noise
+TERRAIN_SCALE_X = 0.015  # Reduced for wider hills
+CAVE_SCALE = 0.05  # Scale for cave system (bigger = smaller caves)
+ORE_SCALE = 0.04  # Scale for ore distribution
+
+def generate_heightmap(perm, world_x, base_height, height_variation):
+    """Compute the unsmoothed surface height for an array of world columns.
+
+    ``base_height`` and ``height_variation`` may be scalars or arrays that
+    broadcast against ``world_x`` (one biome per chunk in a region).
+    """
+    world_x = np.asarray(world_x, dtype=np.float64)
+    zeros = np.zeros_like(world_x)
+
+    # Add low-frequency noise for large-scale terrain variation
+    large_scale_variation = octave_noise_array(perm, world_x * 0.001, zeros, octaves=2) * 15
+    # 1D noise for the x-coordinate keeps terrain consistent across the x-axis
+    noise_val = octave_noise_array(perm, world_x * TERRAIN_SCALE_X, zeros, octaves=6)
+    # Variable base height using noise
+    base_offset = octave_noise_array(perm, world_x * 0.005, zeros, octaves=2) * 10
+
+    # int() truncation toward zero, as in the per-block version
+    return (base_height + np.trunc(base_offset).astype(int)
+            + np.trunc(height_variation * (noise_val * 2 - 1)).astype(int)
+            + np.trunc(large_scale_variation).astype(int))
+
+def fill_terrain_layers(chunk_array, perm, world_x, world_y, heightmap,
+                        surface_block, dirt_depth, ore_rarity):
+    """Fill air, surface, dirt, stone and ore layers for a grid of blocks.
+
+    ``world_x``/``world_y`` are grids shaped like ``chunk_array`` and
+    ``heightmap`` broadcasts against them. Returns the depth grid.
+    """
+    # Position relative to surface (negative = above surface, positive = below)
+    depth = world_y - heightmap
+    surface_block = np.broadcast_to(surface_block, depth.shape)
+    dirt_depth = np.broadcast_to(dirt_depth, depth.shape)
+
+    chunk_array[...] = np.select(
+        [depth < 0, depth == 0, depth <= dirt_depth],
+        [config.EMPTY, surface_block, config.DIRT],
+        default=config.STONE,
+    )
+
+    # Ore noise is only needed for stone cells
+    stone = depth > dirt_depth
+    if not stone.any():
+        return depth
+
+    wx = world_x[stone].astype(np.float64)
+    wy = world_y[stone].astype(np.float64)
+    d = depth[stone]
+    rarity = np.broadcast_to(ore_rarity, depth.shape)[stone]
+
+    # Use different noise patterns for different ore types
+    ore_noise_1 = octave_noise_array(perm, wx * ORE_SCALE, wy * ORE_SCALE, octaves=3)
+    ore_noise_2 = octave_noise_array(perm, wx * ORE_SCALE * 1.7, wy * ORE_SCALE * 1.7, octaves=2)
+    ore_noise_3 = octave_noise_array(perm, wx * ORE_SCALE * 0.5, wy * ORE_SCALE * 0.5, octaves=4)
+
+    # Depth-based ore distribution, first matching rule wins
+    chunk_array[stone] = np.select(
+        [
+            (d > 30) & (ore_noise_1 > 0.75 * rarity),  # Deep ores (diamond)
+            (d > 20) & (ore_noise_2 > 0.70 * rarity),  # Medium depth ores (iron)
+            (d > 5) & (ore_noise_3 > 0.68 * rarity),   # Shallow gravel
+            (3 < d) & (d < 20) & (ore_noise_2 > 0.80), # Sand patches
+        ],
+        [config.DIAMOND_ORE, config.IRON_ORE, config.GRAVEL, config.SAND],
+        default=config.STONE,
+    )
+    return depth
+
+def carve_caves(chunk_array, perm, world_x, world_y, depth):
+    """Carve caves below the surface for a grid of blocks."""
+    # Start caves a bit below the dirt layer
+    below = depth > 3
+    if not below.any():
+        return
+
+    wx = world_x[below].astype(np.float64)
+    wy = world_y[below].astype(np.float64)
+    d = depth[below]
+
+    cave_noise1 = octave_noise_array(perm, wx * CAVE_SCALE, wy * CAVE_SCALE, octaves=3)
+    # Additional noise sample (swapped axes) for more varied caves
+    cave_noise2 = octave_noise_array(perm, wy * CAVE_SCALE * 0.5, wx * CAVE_SCALE * 0.5, octaves=2)
+    combined_cave = cave_noise1 * 0.7 + cave_noise2 * 0.3
+
+    # Cave threshold increases with depth (bigger caves deeper down)
+    # but with a maximum size
+    cave_threshold = np.minimum(0.7, 0.55 + d * 0.001)
+
+    cells = chunk_array[below]
+    cells[combined_cave > cave_threshold] = config.EMPTY
+    chunk_array[below] = cells
+
+def decorate_chunk(chunk_array, heightmap, world_offset_x, world_offset_y, biome):
+    """Place trees, flowers, cacti, snow and water pools on a single chunk.
+
+    Uses the global random generators, so call it right after get_biome()
+    for this chunk to get the same trees as before.
+    """
     TREE_DENSITY = biome.tree_density
-    ORE_RARITY = biome.ore_rarity
-    BASE_HEIGHT = biome.base_height
-    HEIGHT_VARIATION = biome.height_variation
-    
-    # Scale factors for noise
-    terrain_scale_x = 0.015  # Reduced for wider hills
-    terrain_scale_y = 0.01  # Variation of chunks vertically
-    cave_scale = 0.05  # Scale for cave system (bigger = smaller caves)
-    ore_scale = 0.04  # Scale for ore distribution
-    
-    # Calculate absolute vertical position of this chunk in the world
-    absolute_y = world_offset_y
-    
-    # STEP 1: Generate the basic terrain heightmap
-    # For chunks below the surface, we still calculate the surface height
-    # but use it just for reference
-    heightmap = np.zeros(config.CHUNK_SIZE, dtype=int)
-    
-    # Generate coherent heightmap across chunks
-    for x in range(config.CHUNK_SIZE):
-        world_x = world_offset_x + x
-        
-        # Add low-frequency noise for large-scale terrain variation
-        large_scale_variation = octave_noise(perlin, world_x * 0.001, 0, octaves=2) * 15  # Low-frequency noise
-        
-        # Calculate surface height using 1D noise for the x-coordinate
-        # This ensures consistent terrain across the x-axis
-        noise_val = octave_noise(perlin, world_x * terrain_scale_x, 0, octaves=6)  # Increased octaves
-        
-        # Variable base height using noise
-        base_offset = octave_noise(perlin, world_x * 0.005, 0, octaves=2) * 10  # Smaller scale for base variation
-        
-        # Map noise to surface height
-        local_surface = BASE_HEIGHT + int(base_offset) + int(HEIGHT_VARIATION * (noise_val * 2 - 1)) + int(large_scale_variation)
-        heightmap[x] = local_surface
-    
-    # Apply more aggressive smoothing to the heightmap
-    heightmap = gaussian_filter(heightmap, sigma=3.0).astype(int)  # Increased sigma
-    
-    # STEP 2: Fill the chunk with appropriate blocks based on its depth
-    for x in range(config.CHUNK_SIZE):
-        world_x = world_offset_x + x
-        surface_height = heightmap[x]
-        
-        # Use 2D Perlin noise for each (x,y) position
-        for y in range(config.CHUNK_SIZE):
-            world_y = world_offset_y + y
-            
-            # Position relative to surface (negative = above surface, positive = below)
-            depth = world_y - surface_height
-            
-            # TERRAIN LAYERS
-            if depth < 0:
-                # Above surface = air
-                chunk_array[y, x] = config.EMPTY
-            elif depth == 0:
-                # Surface block (grass instead of dirt)
-                chunk_array[y, x] = SURFACE_BLOCK
-            elif depth <= DIRT_DEPTH:
-                # Dirt layer
-                chunk_array[y, x] = config.DIRT
-            else:
-                # Stone layer by default
-                chunk_array[y, x] = config.STONE
-                
-                # ENHANCED ORE DISTRIBUTION
-                # Use different noise patterns for different ore types
-                ore_noise_1 = octave_noise(perlin, world_x * ore_scale, world_y * ore_scale, octaves=3)
-                ore_noise_2 = octave_noise(perlin, world_x * ore_scale * 1.7, world_y * ore_scale * 1.7, octaves=2)
-                ore_noise_3 = octave_noise(perlin, world_x * ore_scale * 0.5, world_y * ore_scale * 0.5, octaves=4)
-                
-                # Depth-based ore distribution - INCREASED ORE GENERATION
-                if depth > 30 and ore_noise_1 > 0.75 * ORE_RARITY:  # Deep ores (diamond) - more common now
-                    chunk_array[y, x] = config.DIAMOND_ORE
-                elif depth > 20 and ore_noise_2 > 0.70 * ORE_RARITY:  # Medium depth ores (iron) - more common
-                    chunk_array[y, x] = config.IRON_ORE
-                elif depth > 5 and ore_noise_3 > 0.68 * ORE_RARITY:  # More common shallow ores
-                    chunk_array[y, x] = config.GRAVEL
-                # Add sand patches using noise
-                elif 3 < depth < 20 and ore_noise_2 > 0.80:
-                    chunk_array[y, x] = config.SAND
-    
-    # STEP 3: Generate caves
-    for x in range(config.CHUNK_SIZE):
-        world_x = world_offset_x + x
-        surface_height = heightmap[x]
-        
-        for y in range(config.CHUNK_SIZE):
-            world_y = world_offset_y + y
-            depth = world_y - surface_height
-            
-            # Only generate caves below the surface
-            if depth > 3:  # Start caves a bit below the dirt layer
-                # Get noise value for cave generation (true 3D noise)
-                cave_noise1 = octave_noise(perlin,
-                                      world_x * cave_scale,
-                                      world_y * cave_scale,
-                                      octaves=3)
-                
-                # Additional noise sample for more varied caves
-                cave_noise2 = octave_noise(perlin,
-                                      world_y * cave_scale * 0.5,
-                                      world_x * cave_scale * 0.5,
-                                      octaves=2)
-                
-                # Combine noise samples
-                combined_cave = cave_noise1 * 0.7 + cave_noise2 * 0.3
-                
-                # Cave threshold increases with depth (bigger caves deeper down)
-                # but with a maximum size
-                cave_threshold = min(0.7, 0.55 + depth * 0.001)  # Adjusted threshold
-                
-                if combined_cave > cave_threshold:
-                    chunk_array[y, x] = config.EMPTY
     
-    # STEP 4: Generate trees and biome-specific decorations
+    # Trees and biome-specific decorations
     for x in range(config.CHUNK_SIZE):
         surface_height = heightmap[x]
         local_surface_y = surface_height - world_offset_y
@@ -227,7 +200,7 @@ def generate_chunk(chunk_array, chunk_x, chunk_y, seed):
                             if chunk_array[local_surface_y - ly, x + lx] == config.EMPTY:
                                 chunk_array[local_surface_y - ly, x + lx] = config.LEAVES
 
-    # STEP 5: Generate water pools - IMPROVED WATER GENERATION
+    # Water pools
     water_placed = False  # Track if water has been placed in this chunk
     
     for x in range(config.CHUNK_SIZE):
@@ -245,10 +218,10 @@ def generate_chunk(chunk_array, chunk_x, chunk_y, seed):
                 # Place water in depressions OR with small random chance in flat areas
                 is_depression = (left_height > surface_height or right_height > surface_height)
                 is_flat = (abs(left_height - surface_height) <= 1 and abs(right_height - surface_height) <= 1)
-                random_pool = np.random.random() < 0.1 and is_flat  # 10% chance for pools on flat ground
+                random_pool = random.random() < 0.1 and is_flat  # 10% chance for pools on flat ground
                 
                 if is_depression or random_pool:
-                    water_depth = np.random.randint(2, 5)  # Random water depth between 2-4 blocks
+                    water_depth = random.randint(2, 4)  # Random water depth between 2-4 blocks
                     
                     for wy in range(1, water_depth + 1):
                         water_y = local_surface_y + wy
@@ -262,12 +235,119 @@ def generate_chunk(chunk_array, chunk_x, chunk_y, seed):
                                     if chunk_array[water_y, x + dx] == config.EMPTY:
                                         if water_y + 1 >= config.CHUNK_SIZE or chunk_array[water_y+1, x+dx] != config.EMPTY:
                                             chunk_array[water_y, x + dx] = config.WATER
+
+def add_bedrock(chunk_array, world_offset_y):
+    """Fill every row deeper than world y 200 with bedrock."""
+    bedrock_start = max(0, 201 - world_offset_y)
+    if bedrock_start < chunk_array.shape[0]:
+        chunk_array[bedrock_start:, :] = config.BEDROCK
+
+def generate_chunk(chunk_array, chunk_x, chunk_y, seed):
+    """Generates terrain for a chunk in Terraria style with biomes."""
+    # Permutation table is cached per seed instead of rebuilt every chunk
+    perm = permutation_table(seed)
+    
+    # Global world coordinates
+    world_offset_x = chunk_x * config.CHUNK_SIZE
+    world_offset_y = chunk_y * config.CHUNK_SIZE
+    
+    # Select biome based on world position
+    biome = get_biome(world_offset_x, world_offset_y, seed)
+    
+    # Constants from biome properties
+    SURFACE_BLOCK = biome.surface_block
+    DIRT_DEPTH = biome.dirt_depth
+    
+    # STEP 1: Generate the basic terrain heightmap
+    # For chunks below the surface, we still calculate the surface height
+    # but use it just for reference
+    columns = world_offset_x + np.arange(config.CHUNK_SIZE)
+    heightmap = generate_heightmap(perm, columns, biome.base_height, biome.height_variation)
+    
+    # Apply more aggressive smoothing to the heightmap
+    heightmap = gaussian_filter(heightmap, sigma=3.0).astype(int)  # Increased sigma
+    
+    # World coordinates of every block, indexed [y, x] like the chunk
+    world_y, world_x = np.mgrid[world_offset_y:world_offset_y + config.CHUNK_SIZE,
+                                world_offset_x:world_offset_x + config.CHUNK_SIZE]
+    
+    # STEP 2: Fill the chunk with appropriate blocks based on its depth
+    depth = fill_terrain_layers(chunk_array, perm, world_x, world_y, heightmap,
+                                SURFACE_BLOCK, DIRT_DEPTH, biome.ore_rarity)
+    
+    # STEP 3: Generate caves
+    carve_caves(chunk_array, perm, world_x, world_y, depth)
+    
+    # STEP 4-5: Trees, decorations and water pools
+    decorate_chunk(chunk_array, heightmap, world_offset_x, world_offset_y, biome)
     
     # STEP 6: Add bedrock at the very bottom of the world
-    if world_offset_y + config.CHUNK_SIZE > 200:  # At depth 200+
-        for x in range(config.CHUNK_SIZE):
-            for y in range(config.CHUNK_SIZE):
-                if world_offset_y + y > 200:
-                    chunk_array[y, x] = config.BEDROCK
+    add_bedrock(chunk_array, world_offset_y)
+    
+    return chunk_array
+
+def generate_region(chunk_x0, chunk_y0, width, height, seed):
+    """Generates a width x height rectangle of chunks in one batched pass.
+
+    Noise fields are computed once for the whole rectangle and then sliced
+    into per-chunk arrays. Each chunk is identical to what generate_chunk
+    produces for the same coordinates.
+
+    Returns a dict {(chunk_x, chunk_y): numpy_array}.
+    """
+    size = config.CHUNK_SIZE
+    perm = permutation_table(seed)
+    
+    world_x0 = chunk_x0 * size
+    world_y0 = chunk_y0 * size
+    
+    # One biome per chunk, laid out [row][column]
+    biomes = [[get_biome((chunk_x0 + cx) * size, (chunk_y0 + cy) * size, seed)
+               for cx in range(width)] for cy in range(height)]
+    
+    def biome_field(attribute):
+        values = np.array([[getattr(b, attribute) for b in row] for row in biomes])
+        return np.repeat(values, size, axis=1)  # (height, width * size)
+    
+    # STEP 1: Heightmaps for every chunk row; the column noise is shared
+    columns = world_x0 + np.arange(width * size)
+    heightmaps = generate_heightmap(perm, columns[np.newaxis, :],
+                                    biome_field("base_height"), biome_field("height_variation"))
+    
+    # Smooth each chunk's 16 columns on their own, like generate_chunk does
+    heightmaps = heightmaps.reshape(height, width, size)
+    heightmaps = gaussian_filter1d(heightmaps, sigma=3.0, axis=-1).astype(int)
+    heightmaps = heightmaps.reshape(height, width * size)
+    
+    # STEP 2-3: Terrain layers and caves for the whole rectangle
+    world_y, world_x = np.mgrid[world_y0:world_y0 + height * size,
+                                world_x0:world_x0 + width * size]
+    region = np.zeros(world_x.shape, dtype=config.CHUNK_DTYPE)
+    
+    def block_field(attribute):
+        return np.repeat(biome_field(attribute), size, axis=0)  # (height * size, width * size)
+    
+    depth = fill_terrain_layers(region, perm, world_x, world_y, np.repeat(heightmaps, size, axis=0),
+                                block_field("surface_block"), block_field("dirt_depth"),
+                                block_field("ore_rarity"))
+    carve_caves(region, perm, world_x, world_y, depth)
+    
+    # STEP 4-5: Decorations are sequential, so they stay per chunk
+    chunks = {}
+    for cy in range(height):
+        for cx in range(width):
+            chunk_x, chunk_y = chunk_x0 + cx, chunk_y0 + cy
+            chunk_array = region[cy * size:(cy + 1) * size, cx * size:(cx + 1) * size]
+            
+            # get_biome reseeds the global random module; redo it so the
+            # trees match single-chunk generation
+            biome = get_biome(chunk_x * size, chunk_y * size, seed)
+            decorate_chunk(chunk_array, heightmaps[cy, cx * size:(cx + 1) * size],
+                           chunk_x * size, chunk_y * size, biome)
+            chunks[(chunk_x, chunk_y)] = chunk_array
+    
+    # STEP 6: Bedrock for the whole rectangle
+    add_bedrock(region, world_y0)
     
-    return chunk_array
\ No newline at end of file
+    # Give every chunk its own memory instead of a view into the region
+    return {coords: chunk_array.copy() for coords, chunk_array in chunks.items()}
@@ -0,0 +1,276 @@
+"""Binary region files for chunk storage.
+
+Chunks are grouped REGION_SIZE x REGION_SIZE per file. Each file starts with
+a small header and an offset table with one entry per chunk slot, followed by
+the chunk payloads. Every chunk can be read or rewritten on its own, so
+saving costs time proportional to the number of chunks written.
+
+File layout:
+    header        MAGIC, version, chunk size, region size
+    offset table  REGION_SIZE * REGION_SIZE entries of
+                  (offset, length, capacity, encoding)
+    payloads      raw, zlib-compressed or palette-encoded chunk bytes,
+                  in SECTOR_SIZE steps
+
+Palette payloads store the chunk's distinct block IDs once, followed by the
+cells as 1, 2 or 4-bit indices into that list, then zlib-compressed. Chunks
+made of a few blocks (sky, solid stone) shrink to a handful of bytes.
+"""
+import os
+import struct
+import threading
+import zlib
+
+import numpy as np
+from core import config
+from world.uniform_chunk import UniformChunk
+
+REGION_SIZE = 32  # Chunks per region side
+SECTOR_SIZE = 256  # Payload slots are allocated in multiples of this
+MAGIC = b"PXRG"
+VERSION = 1
+
+HEADER_FORMAT = "<4sHHH2x"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ENTRY_FORMAT = "<IIIB3x"  # offset, length, capacity, encoding
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+TABLE_SIZE = REGION_SIZE * REGION_SIZE * ENTRY_SIZE
+
+# Payload encodings
+ENCODING_RAW_U8 = 0  # Raw uint8 cells
+ENCODING_ZLIB_U8 = 1  # zlib-compressed uint8 cells
+ENCODING_ZLIB_I32 = 2  # zlib-compressed int32 cells, for IDs that do not fit a byte
+ENCODING_PALETTE = 3  # zlib-compressed palette + packed indices, for chunks with <= 16 block types
+
+PALETTE_MAX_SIZE = 16
+
+def region_coords(chunk_x, chunk_y):
+    """Return the region containing a chunk and the chunk's slot inside it."""
+    return ((chunk_x // REGION_SIZE, chunk_y // REGION_SIZE),
+            (chunk_x % REGION_SIZE, chunk_y % REGION_SIZE))
+
+def _palette_bits(palette_size):
+    """Bits per index for a palette of this size (1, 2 or 4)."""
+    for bits in (1, 2, 4):
+        if palette_size <= 1 << bits:
+            return bits
+    raise ValueError(f"Palette of {palette_size} blocks is too large")
+
+def encode_palette(chunk):
+    """Encode a uint8 chunk as palette + packed indices, or return None if it has too many block types."""
+    palette, indices = np.unique(chunk, return_inverse=True)
+    if len(palette) > PALETTE_MAX_SIZE:
+        return None
+    bits = _palette_bits(len(palette))
+    # Spread each index over `bits` bit planes, most significant bit first
+    index_bits = (indices.reshape(-1, 1) >> np.arange(bits - 1, -1, -1)) & 1
+    return bytes([len(palette)]) + palette.astype(np.uint8).tobytes() + np.packbits(index_bits).tobytes()
+
+def decode_palette(data):
+    """Decode encode_palette() output into a flat uint8 array of cells."""
+    palette_size = data[0]
+    palette = np.frombuffer(data, dtype=np.uint8, count=palette_size, offset=1)
+    bits = _palette_bits(palette_size)
+    cell_count = config.CHUNK_SIZE * config.CHUNK_SIZE
+    index_bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8, offset=1 + palette_size),
+                               count=cell_count * bits).reshape(cell_count, bits)
+    indices = (index_bits.astype(np.uint8) << np.arange(bits - 1, -1, -1, dtype=np.uint8)).sum(axis=1)
+    return palette[indices]
+
+def encode_chunk(chunk):
+    """Encode a chunk array into (encoding, payload bytes), picking the smallest form."""
+    if isinstance(chunk, UniformChunk) and 0 <= chunk.value <= 255:
+        # One-entry palette; every index is 0
+        cell_count = config.CHUNK_SIZE * config.CHUNK_SIZE
+        palette = bytes([1, chunk.value]) + bytes(-(-cell_count // 8))
+        return ENCODING_PALETTE, zlib.compress(palette, 1)
+    chunk = np.asarray(chunk)
+    if chunk.size and (chunk.min() < 0 or chunk.max() > 255):
+        return ENCODING_ZLIB_I32, zlib.compress(chunk.astype("<i4").tobytes(), 1)
+
+    raw = chunk.astype(np.uint8).tobytes()
+    candidates = [(ENCODING_RAW_U8, raw), (ENCODING_ZLIB_U8, zlib.compress(raw, 1))]
+    palette = encode_palette(chunk)
+    if palette is not None:
+        candidates.append((ENCODING_PALETTE, zlib.compress(palette, 1)))
+    return min(candidates, key=lambda candidate: len(candidate[1]))
+
+def decode_chunk(encoding, payload):
+    """Decode a payload back into a (CHUNK_SIZE, CHUNK_SIZE) array of config.CHUNK_DTYPE."""
+    if encoding == ENCODING_RAW_U8:
+        cells = np.frombuffer(payload, dtype=np.uint8)
+    elif encoding == ENCODING_ZLIB_U8:
+        cells = np.frombuffer(zlib.decompress(payload), dtype=np.uint8)
+    elif encoding == ENCODING_ZLIB_I32:
+        cells = np.frombuffer(zlib.decompress(payload), dtype="<i4")
+    elif encoding == ENCODING_PALETTE:
+        cells = decode_palette(zlib.decompress(payload))
+    else:
+        raise ValueError(f"Unknown chunk encoding {encoding}")
+    return cells.reshape((config.CHUNK_SIZE, config.CHUNK_SIZE)).astype(config.CHUNK_DTYPE)
+
+class RegionFile:
+    """A single region file holding up to REGION_SIZE x REGION_SIZE chunks."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = [(0, 0, 0, 0)] * (REGION_SIZE * REGION_SIZE)
+
+        if os.path.exists(path):
+            self.file = open(path, "r+b")
+            self._read_header()
+        else:
+            self.file = open(path, "w+b")
+            self._write_header()
+
+    def _read_header(self):
+        header = self.file.read(HEADER_SIZE)
+        magic, version, chunk_size, region_size = struct.unpack(HEADER_FORMAT, header)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a region file")
+        if version != VERSION or chunk_size != config.CHUNK_SIZE or region_size != REGION_SIZE:
+            raise ValueError(f"Unsupported region file {self.path} "
+                             f"(version {version}, chunk size {chunk_size}, region size {region_size})")
+
+        table = self.file.read(TABLE_SIZE)
+        self.entries = [struct.unpack_from(ENTRY_FORMAT, table, i * ENTRY_SIZE)
+                        for i in range(REGION_SIZE * REGION_SIZE)]
+
+    def _write_header(self):
+        self.file.seek(0)
+        self.file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, config.CHUNK_SIZE, REGION_SIZE))
+        self.file.write(bytes(TABLE_SIZE))
+        self.file.flush()
+
+    @staticmethod
+    def _index(local_x, local_y):
+        return local_y * REGION_SIZE + local_x
+
+    def has_chunk(self, local_x, local_y):
+        """Check whether a chunk slot has been written."""
+        return self.entries[self._index(local_x, local_y)][1] > 0
+
+    def read_chunk(self, local_x, local_y):
+        """Read one chunk, or return None if the slot is empty."""
+        offset, length, _, encoding = self.entries[self._index(local_x, local_y)]
+        if length == 0:
+            return None
+        self.file.seek(offset)
+        return decode_chunk(encoding, self.file.read(length))
+
+    def write_chunk(self, local_x, local_y, chunk):
+        """Write one chunk, in place when it fits its slot, otherwise at the end."""
+        encoding, payload = encode_chunk(chunk)
+        index = self._index(local_x, local_y)
+        offset, _, capacity, _ = self.entries[index]
+
+        if len(payload) > capacity:
+            # Allocate a new slot at the end of the file; the old one is left unused
+            self.file.seek(0, os.SEEK_END)
+            offset = max(self.file.tell(), HEADER_SIZE + TABLE_SIZE)
+            capacity = -(-len(payload) // SECTOR_SIZE) * SECTOR_SIZE
+
+        self.file.seek(offset)
+        self.file.write(payload.ljust(capacity, b"\0"))
+
+        entry = (offset, len(payload), capacity, encoding)
+        self.entries[index] = entry
+        self.file.seek(HEADER_SIZE + index * ENTRY_SIZE)
+        self.file.write(struct.pack(ENTRY_FORMAT, *entry))
+
+    def stored_chunks(self):
+        """Yield the (local_x, local_y) of every written slot."""
+        for index, entry in enumerate(self.entries):
+            if entry[1] > 0:
+                yield index % REGION_SIZE, index // REGION_SIZE
+
+    def flush(self, fsync=False):
+        self.file.flush()
+        if fsync:
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+class RegionStore:
+    """All region files of a world, stored in one directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.regions = {}  # {(region_x, region_y): RegionFile}
+        self.lock = threading.RLock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _region_path(self, region_x, region_y):
+        return os.path.join(self.directory, f"r.{region_x}.{region_y}.bin")
+
+    def _get_region(self, region_x, region_y, create=False):
+        region = self.regions.get((region_x, region_y))
+        if region is None:
+            path = self._region_path(region_x, region_y)
+            if not create and not os.path.exists(path):
+                return None
+            region = RegionFile(path)
+            self.regions[(region_x, region_y)] = region
+        return region
+
+    def load_chunk(self, chunk_x, chunk_y):
+        """Read a stored chunk, or return None if it was never saved."""
+        (region_x, region_y), (local_x, local_y) = region_coords(chunk_x, chunk_y)
+        with self.lock:
+            region = self._get_region(region_x, region_y)
+            if region is None:
+                return None
+            return region.read_chunk(local_x, local_y)
+
+    def save_chunk(self, chunk_x, chunk_y, chunk):
+        """Write a single chunk."""
+        (region_x, region_y), (local_x, local_y) = region_coords(chunk_x, chunk_y)
+        with self.lock:
+            self._get_region(region_x, region_y, create=True).write_chunk(local_x, local_y, chunk)
+
+    def save_chunks(self, chunks, fsync=False):
+        """Write several chunks {(chunk_x, chunk_y): array} and flush the touched files."""
+        with self.lock:
+            touched = set()
+            for (chunk_x, chunk_y), chunk in chunks.items():
+                (region_x, region_y), (local_x, local_y) = region_coords(chunk_x, chunk_y)
+                region = self._get_region(region_x, region_y, create=True)
+                region.write_chunk(local_x, local_y, chunk)
+                touched.add(region)
+            for region in touched:
+                region.flush(fsync)
+
+    def has_chunk(self, chunk_x, chunk_y):
+        (region_x, region_y), (local_x, local_y) = region_coords(chunk_x, chunk_y)
+        with self.lock:
+            region = self._get_region(region_x, region_y)
+            return region is not None and region.has_chunk(local_x, local_y)
+
+    def stored_chunks(self):
+        """List the coordinates of every chunk stored in this directory."""
+        coords = []
+        with self.lock:
+            for name in os.listdir(self.directory):
+                parts = name.split(".")
+                if len(parts) != 4 or parts[0] != "r" or parts[3] != "bin":
+                    continue
+                try:
+                    region_x, region_y = int(parts[1]), int(parts[2])
+                except ValueError:
+                    continue
+                region = self._get_region(region_x, region_y)
+                for local_x, local_y in region.stored_chunks():
+                    coords.append((region_x * REGION_SIZE + local_x, region_y * REGION_SIZE + local_y))
+        return coords
+
+    def flush(self, fsync=False):
+        with self.lock:
+            for region in self.regions.values():
+                region.flush(fsync)
+
+    def close(self):
+        with self.lock:
+            for region in self.regions.values():
+                region.close()
+            self.regions = {}
@@ -0,0 +1,62 @@
+import numpy as np
+from core import config
+
+class UniformChunk:
+    """A chunk where every cell holds the same block, stored as one value.
+
+    Sky chunks (all EMPTY) and deep chunks (all BEDROCK) make up most of the
+    world; this avoids a full array for each of them. Reads behave like a
+    read-only array (indexing, slicing, np.asarray, tolist); writers must
+    call to_array() first and store the result in place of this object, as
+    set_block_at does.
+    """
+
+    __slots__ = ("value",)
+
+    shape = (config.CHUNK_SIZE, config.CHUNK_SIZE)
+    dtype = np.dtype(config.CHUNK_DTYPE)
+    size = config.CHUNK_SIZE * config.CHUNK_SIZE
+
+    def __init__(self, value):
+        self.value = int(value)
+
+    def __getitem__(self, key):
+        if (isinstance(key, tuple) and len(key) == 2 and
+                all(isinstance(k, (int, np.integer)) for k in key)):
+            return self.value
+        return self._view()[key]
+
+    def __array__(self, dtype=None, copy=None):
+        return self.to_array() if dtype is None else self.to_array().astype(dtype)
+
+    def __repr__(self):
+        return f"UniformChunk({self.value})"
+
+    def _view(self):
+        return np.broadcast_to(np.array(self.value, dtype=self.dtype), self.shape)
+
+    def to_array(self):
+        """Return a writable full array with this chunk's contents."""
+        return np.full(self.shape, self.value, dtype=self.dtype)
+
+    def copy(self):
+        # Immutable, so sharing is safe
+        return self
+
+    def tolist(self):
+        return [[self.value] * config.CHUNK_SIZE for _ in range(config.CHUNK_SIZE)]
+
+    def min(self):
+        return self.value
+
+    def max(self):
+        return self.value
+
+def compact_chunk(chunk):
+    """Return a UniformChunk if every cell of the array holds the same block, else the array."""
+    if isinstance(chunk, UniformChunk):
+        return chunk
+    first = chunk.flat[0]
+    if (chunk == first).all():
+        return UniformChunk(first)
+    return chunk